@@ -0,0 +1,77 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.common.caching import is_cache_shared
+
+BLACKLIST_CACHE_KEY = 'token_blacklisted:{jti}'
+# Сколько секунд хранится "токена нет в черном списке". Токен,
+# добавленный в список мимо сигнала (bulk_create, другая база),
+# будет считаться действующим не дольше этого времени
+NOT_BLACKLISTED_CACHE_TIMEOUT = 30
+
+
+def get_token_timeout(payload) -> int:
+    """
+    Сколько секунд осталось до истечения токена
+    """
+    return max(int(payload.get('exp', 0) - time.time()), 1)
+
+
+def is_token_blacklisted(payload) -> bool:
+    """
+    Проверка токена по черному списку. Результат кешируется только
+    в общем для всех процессов кеше: токен из черного списка - до его
+    истечения, токен не из списка - на NOT_BLACKLISTED_CACHE_TIMEOUT
+    секунд. При добавлении в черный список запись в кеше сразу
+    перезаписывается (remember_blacklisted_token). Без общего кеша
+    токен всегда проверяется в базе: сброс записи в кеше одного
+    процесса не дошел бы до остальных
+    """
+    jti = payload.get(api_settings.JTI_CLAIM)
+    if not is_cache_shared():
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    key = BLACKLIST_CACHE_KEY.format(jti=jti)
+    blacklisted = cache.get(key)
+    if blacklisted is None:
+        blacklisted = BlacklistedToken.objects.filter(
+            token__jti=jti
+        ).exists()
+        if blacklisted:
+            cache.set(key, True, get_token_timeout(payload))
+        else:
+            # add, а не set: если токен успели добавить в черный
+            # список после запроса к базе, True в кеше не затирается
+            cache.add(key, False, NOT_BLACKLISTED_CACHE_TIMEOUT)
+    return blacklisted
+
+
+def remember_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    После коммита записывает в кеш токен, добавленный в черный список,
+    поверх закешированного "токена нет в черном списке"
+    """
+    if created:
+        outstanding = instance.token
+        timeout = max(
+            int(outstanding.expires_at.timestamp() - time.time()), 1
+        )
+        transaction.on_commit(lambda: cache.set(
+            BLACKLIST_CACHE_KEY.format(jti=outstanding.jti), True, timeout
+        ))
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    RefreshToken, который проверяет черный список через кеш
+    """
+
+    def check_blacklist(self):
+        if is_token_blacklisted(self.payload):
+            raise TokenError(_('Token is blacklisted'))
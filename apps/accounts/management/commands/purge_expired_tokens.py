@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (BlacklistedToken,
+                                                             OutstandingToken)
+
+
+class Command(BaseCommand):
+    """
+    Удаление истекших токенов из OutstandingToken и BlacklistedToken.
+    В отличие от flushexpiredtokens из simplejwt, токены удаляются
+    пачками по id, каждая пачка в своей транзакции, с паузой между
+    пачками. Истекший токен не пройдет проверку и без черного списка,
+    поэтому удалять его безопасно.
+    Команду нужно запускать по расписанию, например раз в сутки из cron
+    """
+    help = 'Удаление истекших JWT-токенов пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Количество токенов в пачке')
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help='Пауза между пачками в секундах')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by('id')
+        last_id = 0
+        outstanding = blacklisted = 0
+        while True:
+            ids = list(expired.filter(id__gt=last_id).values_list(
+                'id', flat=True
+            )[:options['batch_size']])
+            if not ids:
+                break
+            last_id = ids[-1]
+            with transaction.atomic():
+                # Сначала черный список, затем сами токены. Текст токенов
+                # при удалении не загружается
+                blacklisted += BlacklistedToken.objects.filter(
+                    token_id__in=ids
+                ).delete()[0]
+                outstanding += OutstandingToken.objects.filter(
+                    id__in=ids
+                ).only('id').delete()[0]
+            self.stdout.write(f'Удалено токенов: {outstanding}')
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено токенов: {outstanding}, '
+            f'из черного списка: {blacklisted}'
+        ))
@@ -1,7 +1,11 @@
 from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (TokenObtainPairSerializer,
+                                                  TokenRefreshSerializer,
+                                                  TokenVerifySerializer)
+from rest_framework_simplejwt.tokens import UntypedToken
 
+from .blacklist import CachedRefreshToken, is_token_blacklisted
 from .models import User
 
 
@@ -39,3 +43,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
             token['role'] = user.account_type
 
         return token
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Обновление токенов с проверкой черного списка через кеш
+    """
+    token_class = CachedRefreshToken
+
+
+class CachedTokenVerifySerializer(TokenVerifySerializer):
+    """
+    Проверка токена с проверкой черного списка через кеш
+    """
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if is_token_blacklisted(token.payload):
+            raise serializers.ValidationError('Token is blacklisted')
+        return {}
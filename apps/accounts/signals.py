@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.accounts.blacklist import remember_blacklisted_token
+from apps.accounts.models import User
+from apps.common.authentication import invalidate_user_cache
+from apps.common.images import process_new_images, remember_new_images
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Сброс пользователя в кеше аутентификации при любом его изменении
+    """
+    invalidate_user_cache(instance.pk)
+
+
+# Создание вариантов загруженного фото пользователя
+pre_save.connect(remember_new_images, sender=User)
+post_save.connect(process_new_images, sender=User)
+
+post_save.connect(invalidate_cached_user, sender=User)
+post_delete.connect(invalidate_cached_user, sender=User)
+post_save.connect(remember_blacklisted_token, sender=BlacklistedToken)
@@ -0,0 +1,91 @@
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (BlacklistedToken,
+                                                             OutstandingToken)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('Token', 'User',
+                                             'token@example.com', 'password')
+        self.client = APIClient()
+
+    def test_rotated_token_cannot_be_reused(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        response = self.client.post('/auth/token/refresh/',
+                                    {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/auth/token/refresh/',
+                                    {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_blacklisted_elsewhere_is_seen_after_verify(self):
+        """
+        Токен проверили (verify), затем другой процесс добавил его
+        в черный список. В кеше этого процесса записи о черном списке
+        нет, но обновление токена все равно должно быть отклонено
+        """
+        token = RefreshToken.for_user(self.user)
+        response = self.client.post('/auth/token/verify/',
+                                    {'token': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        # bulk_create не отправляет post_save, поэтому кеш этого
+        # процесса о новой записи не узнает, как и при записи из
+        # другого процесса
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(
+            token=OutstandingToken.objects.get(jti=token['jti'])
+        )])
+
+        response = self.client.post('/auth/token/refresh/',
+                                    {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/auth/token/verify/',
+                                    {'token': str(token)}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SharedCacheTokenBlacklistTests(TestCase):
+    """
+    Черный список с общим для процессов кешем
+    """
+
+    def setUp(self):
+        self.location = tempfile.TemporaryDirectory()
+        self.addCleanup(self.location.cleanup)
+        settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.location.name,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = User.objects.create_user('Token', 'User',
+                                             'token@example.com', 'password')
+        self.client = APIClient()
+
+    def verify(self, token):
+        return self.client.post('/auth/token/verify/',
+                                {'token': str(token)}, format='json')
+
+    def test_not_blacklisted_is_cached(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.verify(token).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.verify(token).status_code, 200)
+
+    def test_blacklisting_overwrites_cached_result(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.verify(token).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        self.assertEqual(self.verify(token).status_code, 400)
+        response = self.client.post('/auth/token/refresh/',
+                                    {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 401)
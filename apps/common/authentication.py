@@ -0,0 +1,110 @@
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.common.caching import is_cache_shared
+
+USER_CACHE_TIMEOUT = 60
+USER_CACHE_KEY = 'auth_user:{user_id}'
+USER_CACHE_VERSION_KEY = 'auth_user_version:{user_id}'
+
+
+def get_user_cache_version(user_id) -> int:
+    return cache.get(USER_CACHE_VERSION_KEY.format(user_id=user_id), 0)
+
+
+def invalidate_user_cache(user_id):
+    """
+    Сбрасывает пользователя в кеше аутентификации. Вместо удаления
+    записи меняется версия: запрос, который прочитал пользователя
+    из базы до изменения, запишет его под старой версией, и устаревшие
+    данные никто не прочитает
+    """
+    cache.set(USER_CACHE_VERSION_KEY.format(user_id=user_id),
+              time.time_ns(), None)
+
+
+def get_user(user_model, user_id):
+    """
+    Пользователь вместе с профилем продавца (user.seller) одним
+    запросом. Возвращает None, если пользователя нет
+    """
+    return user_model.objects.select_related('seller').filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).first()
+
+
+def get_cached_user(user_model, user_id):
+    """
+    Пользователь вместе с профилем продавца из кеша. Кешируется только
+    в общем для всех процессов кеше: сброс версии в LocMemCache
+    не дошел бы до других процессов, и они аутентифицировали бы
+    отключенного пользователя или пользователя со старым паролем.
+    Без общего кеша пользователь каждый раз загружается из базы
+    """
+    if not is_cache_shared():
+        return get_user(user_model, user_id)
+    key = USER_CACHE_KEY.format(user_id=user_id)
+    version = get_user_cache_version(user_id)
+    user = cache.get(key, version=version)
+    if user is None:
+        user = get_user(user_model, user_id)
+        if user is not None:
+            cache.set(key, user, USER_CACHE_TIMEOUT, version=version)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, который берет пользователя и его профиль
+    продавца из кеша на USER_CACHE_TIMEOUT секунд, а не из базы
+    на каждый запрос. Кеш сбрасывается сигналами при сохранении
+    и удалении User и Seller (apps.accounts.signals,
+    apps.sellers.signals).
+    request.user может быть копией из кеша, поэтому views сохраняют
+    его только с update_fields: полное сохранение записало бы
+    в базу устаревшие значения остальных полей
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        user = get_cached_user(self.user_model, user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code='password_changed'
+                )
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Схема авторизации CachedJWTAuthentication для drf-spectacular,
+    такая же, как у JWTAuthentication
+    """
+    target_class = 'apps.common.authentication.CachedJWTAuthentication'
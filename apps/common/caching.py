@@ -0,0 +1,13 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_cache_shared(alias='default') -> bool:
+    """
+    Общий ли кеш у всех процессов сервера. LocMemCache (по умолчанию,
+    если CACHES не настроен) у каждого процесса свой: сброс записи
+    в одном процессе не доходит до остальных, и они до истечения
+    записи видят устаревшие данные
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
@@ -0,0 +1,15 @@
+from autoslug import AutoSlugField
+
+
+class BulkAutoSlugField(AutoSlugField):
+    """
+    AutoSlugField, который можно пропустить при массовом создании.
+    Если у экземпляра выставлен атрибут _slug_allocated, slug уже
+    подобран заранее (например, пачкой в импорте товаров), и поиск
+    уникального значения отдельным запросом не выполняется
+    """
+
+    def pre_save(self, instance, add):
+        if getattr(instance, '_slug_allocated', False):
+            return getattr(instance, self.attname)
+        return super().pre_save(instance, add)
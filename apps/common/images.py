@@ -0,0 +1,137 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models, transaction
+
+logger = logging.getLogger(__name__)
+
+# Варианты картинок: название -> максимальный размер (ширина, высота).
+# Все варианты сохраняются в WebP рядом с оригиналом
+IMAGE_VARIANTS = {
+    'thumb': (150, 150),
+    'small': (400, 400),
+    'medium': (800, 800),
+}
+WEBP_QUALITY = 80
+IMAGE_WORKERS = 2
+
+_executor = None
+
+
+def get_executor():
+    """
+    Пул процессов для обработки картинок. Создается при первом вызове
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def variant_name(name: str, variant: str) -> str:
+    """
+    Имя файла варианта: products_image/photo.jpg ->
+    products_image/photo_thumb.webp
+    """
+    root, _ = os.path.splitext(name)
+    return f'{root}_{variant}.webp'
+
+
+def render_variants(path: str) -> list:
+    """
+    Создание всех вариантов картинки. Выполняется в отдельном процессе,
+    поэтому работает только с путями файлов и Pillow
+    """
+    from PIL import Image, ImageOps
+
+    created = []
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info
+                                  else 'RGB')
+        for variant, size in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+            output = variant_name(path, variant)
+            resized.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+            created.append(output)
+    return created
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Не удалось создать варианты картинки: %s', error)
+
+
+def schedule_variants(names) -> None:
+    """
+    Отправка картинок в пул процессов для создания вариантов
+    """
+    for name in names:
+        future = get_executor().submit(render_variants,
+                                       default_storage.path(name))
+        future.add_done_callback(_log_failure)
+
+
+def variant_urls(field_file, request=None):
+    """
+    Ссылки на все варианты картинки. Имена вариантов вычисляются
+    из имени оригинала, поэтому обращения к хранилищу не нужны
+    """
+    if not field_file:
+        return None
+    return variant_urls_for_name(field_file.name, request)
+
+
+def variant_urls_for_name(name: str, request=None):
+    """
+    Ссылки на варианты картинки по имени файла оригинала
+    """
+    if not name:
+        return None
+    if isinstance(default_storage, FileSystemStorage):
+        # У локального хранилища ссылки вариантов отличаются только
+        # суффиксом, поэтому дорогой url() вызывается один раз
+        base_url = default_storage.url(os.path.splitext(name)[0])
+        urls = {variant: f'{base_url}_{variant}.webp'
+                for variant in IMAGE_VARIANTS}
+    else:
+        urls = {variant: default_storage.url(variant_name(name, variant))
+                for variant in IMAGE_VARIANTS}
+    if request is not None:
+        urls = {variant: request.build_absolute_uri(url)
+                for variant, url in urls.items()}
+    return urls
+
+
+def image_fields(instance):
+    return [field.name for field in instance._meta.concrete_fields
+            if isinstance(field, models.ImageField)]
+
+
+def remember_new_images(sender, instance, **kwargs):
+    """
+    pre_save: запоминает поля, в которые загружен новый файл.
+    Файл еще не сохранен в хранилище (_committed=False)
+    """
+    instance._new_images = [
+        name for name in image_fields(instance)
+        if getattr(instance, name) and not getattr(instance, name)._committed
+    ]
+
+
+def process_new_images(sender, instance, **kwargs):
+    """
+    post_save: после коммита транзакции отправляет новые картинки
+    на обработку
+    """
+    fields = getattr(instance, '_new_images', None)
+    if not fields:
+        return
+    names = [getattr(instance, name).name for name in fields]
+    instance._new_images = []
+    transaction.on_commit(lambda: schedule_variants(names))
@@ -0,0 +1,159 @@
+import time
+from datetime import timedelta
+
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.common.models import ArchivedRecord
+from apps.profiles.models import Order, OrderItem
+from apps.reviews.models import Review
+from apps.sellers.models import SalesRollup, Seller
+from apps.shop.cart import invalidate_cart_summary
+from apps.shop.models import Products
+
+
+def get_candidates(name, cutoff):
+    """
+    Записи, помеченные удаленными раньше cutoff, которые можно удалить
+    из таблицы. Записи, удаление которых каскадом затронет историю
+    заказов, продаж или рейтинг товаров, пропускаются
+    """
+    if name == 'reviews':
+        queryset = Review.objects.unfiltered()
+    elif name == 'products':
+        # OrderItem.product и SalesRollup.product удаляются каскадом,
+        # поэтому товары из оформленных заказов остаются в базе
+        queryset = Products.objects.unfiltered().exclude(
+            Exists(OrderItem.objects.filter(product=OuterRef('pk'),
+                                            order__isnull=False))
+        ).exclude(
+            Exists(SalesRollup.objects.filter(product=OuterRef('pk')))
+        )
+    else:
+        # Вместе с пользователем удалились бы его заказы, магазин
+        # и живые отзывы, которые учтены в рейтинге товаров
+        queryset = User.objects.exclude(
+            Exists(Order.objects.filter(user=OuterRef('pk')))
+        ).exclude(
+            Exists(Seller.objects.filter(user=OuterRef('pk')))
+        ).exclude(
+            Exists(Review.objects.filter(user=OuterRef('pk')))
+        )
+    return queryset.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+
+def get_collected(collector) -> list:
+    """
+    Все записи, которые удалит collector, включая каскадные,
+    сгруппированные по модели
+    """
+    groups = [list(instances) for instances in collector.data.values()]
+    groups += [list(queryset) for queryset in collector.fast_deletes]
+    return [instances for instances in groups if instances]
+
+
+def archive(groups) -> int:
+    """
+    Сохраняет копии записей в ArchivedRecord
+    """
+    records = []
+    for instances in groups:
+        for instance, data in zip(
+            instances, serializers.serialize('python', instances)
+        ):
+            records.append(ArchivedRecord(
+                model=data['model'],
+                object_id=str(instance.pk),
+                deleted_at=getattr(instance, 'deleted_at', None),
+                data=data['fields'],
+            ))
+    ArchivedRecord.objects.bulk_create(records, batch_size=1000)
+    return len(records)
+
+
+class Command(BaseCommand):
+    """
+    Перенос в архив (ArchivedRecord) или окончательное удаление
+    записей, помеченных удаленными больше --days дней назад.
+    Записи удаляются пачками, каждая пачка в своей транзакции,
+    с паузой --sleep между пачками, чтобы не держать блокировки
+    таблиц долго. Прогресс - это сами удаленные записи: если команду
+    прервать, откатится только текущая пачка, а повторный запуск
+    продолжит с оставшихся записей
+    """
+    help = 'Архивация и удаление давно удаленных записей'
+
+    MODELS = ('reviews', 'products', 'users')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help='Сколько дней запись должна быть удалена')
+        parser.add_argument('--models', nargs='+', choices=self.MODELS,
+                            default=self.MODELS,
+                            help='Какие таблицы обрабатывать')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Количество записей в пачке')
+        parser.add_argument('--sleep', type=float, default=0.5,
+                            help='Пауза между пачками в секундах')
+        parser.add_argument('--purge', action='store_true',
+                            help='Удалить без переноса в архив')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только посчитать записи')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Сначала отзывы, затем товары и пользователи, чтобы
+        # каскадом удалялось как можно меньше записей
+        for name in self.MODELS:
+            if name not in options['models']:
+                continue
+            candidates = get_candidates(name, cutoff)
+            if options['dry_run']:
+                self.stdout.write(f'{name}: к удалению {candidates.count()}')
+                continue
+            deleted = archived = 0
+            while True:
+                batch_deleted, batch_archived = self.process_batch(
+                    candidates, options['batch_size'], options['purge']
+                )
+                if not batch_deleted:
+                    break
+                deleted += batch_deleted
+                archived += batch_archived
+                self.stdout.write(f'{name}: удалено {deleted}, '
+                                  f'в архиве {archived}')
+                time.sleep(options['sleep'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: удалено записей {deleted}'
+            ))
+
+    @transaction.atomic
+    def process_batch(self, candidates, batch_size, purge):
+        """
+        Архивирует и удаляет одну пачку. Возвращает количество
+        удаленных записей (с каскадными) и записей в архиве
+        """
+        instances = list(candidates.select_for_update()[:batch_size])
+        if not instances:
+            return 0, 0
+        collector = Collector(using=router.db_for_write(candidates.model))
+        collector.collect(instances)
+        groups = get_collected(collector)
+        archived = 0 if purge else archive(groups)
+        deleted, _ = collector.delete()
+        # Из корзин могли удалиться товары, сводка корзин устарела
+        user_ids = {item.user_id for instances in groups
+                    for item in instances
+                    if isinstance(item, OrderItem) and item.user_id}
+        for user_id in user_ids:
+            transaction.on_commit(
+                lambda user_id=user_id: invalidate_cart_summary(
+                    User(pk=user_id)
+                )
+            )
+        return deleted, archived
@@ -0,0 +1,145 @@
+import io
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import User
+from apps.common.parsers import ORJSONParser
+from apps.common.renderers import ORJSONRenderer, orjson
+from apps.profiles.models import OrderItem
+from apps.sellers.models import Seller
+from apps.shop.models import Category, Products
+from apps.shop.views import CartView, ProductsView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Проверка, что ORJSONRenderer и ORJSONParser дают тот же результат,
+    что и JSONRenderer и JSONParser, и замер скорости на ответах
+    ProductsView и CartView. Тестовые данные создаются в транзакции,
+    которая затем откатывается
+    """
+    help = 'Сравнение JSONRenderer/JSONParser и их версий на orjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100,
+                            help='Количество товаров в списке и корзине')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не установлен')
+        try:
+            with transaction.atomic():
+                user = self.create_fixtures(options['products'])
+                payloads = self.get_payloads(user, options['products'])
+                self.compare(payloads)
+                self.benchmark(payloads, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixtures(self, count):
+        user = User.objects.create_user('Bench', 'Mark',
+                                        'benchmark@example.com', None)
+        seller = Seller.objects.create(user=user,
+                                       business_name='Benchmark «Ёж»',
+                                       inn_identification_number='0',
+                                       phone_number='0',
+                                       business_description='-',
+                                       business_address='-',
+                                       city='-',
+                                       postal_code='0',
+                                       bank_name='-',
+                                       bank_bic_number='0',
+                                       bank_account_number='0',
+                                       bank_routing_number='0')
+        category = Category.objects.create(name='Benchmark category',
+                                           image='category_images/x.jpg')
+        products = []
+        for index in range(count):
+            product = Products(
+                seller=seller if index % 5 else None,
+                category=category,
+                name=f'Товар {index} "в кавычках" \u2028\u2029 😀',
+                slug=f'benchmark-product-{index}',
+                desc='Описание\tтовара\n\\ </script> ' * 20,
+                price_current=Decimal(index) + Decimal('0.99'),
+                price_old=Decimal(index * 2) if index % 3 else None,
+                image1='products_image/x.jpg',
+                rating_sum=index % 11,
+                rating_count=index % 3,
+                rating_avg=(index % 11) / (index % 3) if index % 3 else None,
+            )
+            product._slug_allocated = True
+            products.append(product)
+        Products.objects.bulk_create(products)
+        OrderItem.objects.bulk_create(
+            OrderItem(user=user, product=product, quantity=index + 1)
+            for index, product in enumerate(products)
+        )
+        return user
+
+    def get_payloads(self, user, count):
+        factory = APIRequestFactory()
+        request = factory.get('/shop/products/', {'page_size': count})
+        products = ProductsView.as_view()(request).data
+        request = factory.get('/shop/cart/')
+        force_authenticate(request, user=user)
+        cart = CartView.as_view()(request).data
+        # Строки из values() проверяют Decimal, UUID и datetime как есть
+        rows = list(Products.objects.values()[:count])
+        return {'ProductsView': products, 'CartView': cart,
+                'Products.values()': rows}
+
+    def compare(self, payloads):
+        for name, data in payloads.items():
+            expected = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != expected:
+                raise CommandError(f'Рендеринг отличается для {name}')
+            parsed = ORJSONParser().parse(io.BytesIO(expected))
+            if parsed != JSONParser().parse(io.BytesIO(expected)):
+                raise CommandError(f'Разбор отличается для {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'JSON совпадает для {len(payloads)} ответов'
+        ))
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2] * 1000
+
+    def benchmark(self, payloads, repeat):
+        self.stdout.write(f'Медиана {repeat} замеров, мс:')
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            results = (
+                ('render', JSONRenderer().render, ORJSONRenderer().render,
+                 data),
+                ('parse',
+                 lambda body: JSONParser().parse(io.BytesIO(body)),
+                 lambda body: ORJSONParser().parse(io.BytesIO(body)),
+                 body),
+            )
+            for action, default, fast, argument in results:
+                before = self.measure(lambda: default(argument), repeat)
+                after = self.measure(lambda: fast(argument), repeat)
+                self.stdout.write(
+                    f'  {name} {action} ({len(body)} байт): '
+                    f'{before:.3f} -> {after:.3f} '
+                    f'({before / after:.1f}x)'
+                )
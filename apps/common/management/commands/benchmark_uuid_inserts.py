@@ -0,0 +1,111 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.accounts.models import User
+from apps.common.models import uuid7
+from apps.profiles.models import OrderItem
+from apps.reviews.models import Review
+from apps.shop.models import Category, Products
+
+GENERATORS = (
+    ('uuid4', uuid.uuid4),
+    ('uuid7', uuid7),
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Сравнение скорости вставки в OrderItem и Review с id uuid4 и uuid7.
+    Замеряется только bulk_create самих записей. Каждый замер идет
+    в отдельной транзакции, которая затем откатывается. Скорость
+    выводится по частям, чтобы было видно, как она падает по мере
+    роста индекса первичного ключа. Все записи замера (для Review -
+    еще и по автору на отзыв) держатся в одной транзакции, поэтому
+    большое --rows требует много места под журнал базы
+    """
+    help = 'Скорость вставки записей с id uuid4 и uuid7'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000,
+                            help='Количество записей в каждом замере')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Размер пачки bulk_create')
+        parser.add_argument('--parts', type=int, default=5,
+                            help='На сколько частей делить замер')
+
+    def handle(self, *args, **options):
+        for model in (OrderItem, Review):
+            for name, generator in GENERATORS:
+                speeds = self.run(model, generator, options['rows'],
+                                  options['batch_size'], options['parts'])
+                self.stdout.write(
+                    f'{model.__name__} {name}, записей/с по частям: '
+                    + ' '.join(f'{speed:,.0f}' for speed in speeds)
+                )
+
+    def run(self, model, generator, rows, batch_size, parts) -> list:
+        try:
+            with transaction.atomic():
+                user, product = self.create_fixtures()
+                speeds = self.insert(model, generator, user, product, rows,
+                                     batch_size, parts)
+                raise Rollback
+        except Rollback:
+            pass
+        return speeds
+
+    def create_fixtures(self):
+        user = User.objects.create_user('Bench', 'Mark',
+                                        'benchmark@example.com', None)
+        category = Category.objects.create(name='Benchmark category',
+                                           image='category_images/x.jpg')
+        product = Products(category=category,
+                           name='Benchmark product',
+                           slug='benchmark-product',
+                           desc='-',
+                           price_current=Decimal('1.00'),
+                           image1='products_image/x.jpg')
+        product._slug_allocated = True
+        product.save()
+        return user, product
+
+    def build(self, model, generator, user, product, count) -> list:
+        if model is OrderItem:
+            return [OrderItem(id=generator(), user=user, product=product)
+                    for _ in range(count)]
+        # Живой отзыв у пользователя на товар может быть только один
+        # (reviews_one_live_per_user), поэтому у каждого отзыва свой
+        # автор. Авторы создаются до начала замера
+        authors = User.objects.bulk_create([
+            User(first_name='Bench', last_name='Mark',
+                 email=f'benchmark-{uuid.uuid4().hex}@example.com',
+                 password='!')
+            for _ in range(count)
+        ])
+        return [Review(id=generator(), user=author, product=product,
+                       rating=5)
+                for author in authors]
+
+    def insert(self, model, generator, user, product, rows, batch_size,
+               parts) -> list:
+        part_size = max(rows // parts, 1)
+        speeds = []
+        for _ in range(parts):
+            elapsed = 0
+            for offset in range(0, part_size, batch_size):
+                count = min(batch_size, part_size - offset)
+                objects = self.build(model, generator, user, product, count)
+                # Замеряется только вставка, без создания объектов
+                start = time.perf_counter()
+                model.objects.bulk_create(objects)
+                elapsed += time.perf_counter() - start
+            speeds.append(part_size / elapsed)
+        return speeds
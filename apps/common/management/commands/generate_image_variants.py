@@ -0,0 +1,63 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import User
+from apps.common.images import (IMAGE_VARIANTS, get_executor,
+                                render_variants, variant_name)
+from apps.shop.models import Category, Products
+
+IMAGE_SOURCES = (
+    (Products, ('image1', 'image2', 'image3')),
+    (Category, ('image',)),
+    (User, ('avatar',)),
+)
+
+
+class Command(BaseCommand):
+    """
+    Создание вариантов для уже загруженных картинок продуктов,
+    категорий и фото пользователей. Картинки обрабатываются
+    в пуле процессов
+    """
+    help = 'Создание уменьшенных WebP-вариантов картинок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Пересоздать существующие варианты')
+
+    def get_image_names(self):
+        names = set()
+        for model, fields in IMAGE_SOURCES:
+            for field in fields:
+                names.update(model._base_manager.exclude(
+                    **{field: ''}
+                ).exclude(
+                    **{f'{field}__isnull': True}
+                ).values_list(field, flat=True).distinct())
+        return sorted(names)
+
+    def handle(self, *args, **options):
+        paths = []
+        for name in self.get_image_names():
+            if not default_storage.exists(name):
+                self.stderr.write(f'Файл не найден: {name}')
+                continue
+            if not options['force'] and all(
+                    default_storage.exists(variant_name(name, variant))
+                    for variant in IMAGE_VARIANTS):
+                continue
+            paths.append(default_storage.path(name))
+
+        processed = 0
+        futures = [get_executor().submit(render_variants, path)
+                   for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                future.result()
+                processed += 1
+            except Exception as error:
+                self.stderr.write(f'{path}: {error}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано картинок: {processed}')
+        )
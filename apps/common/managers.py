@@ -32,7 +32,7 @@ class IsDeletedQuerySet(GetOrNoneQuerySet):
     """
     def delete(self, hard_delete=False):
         if hard_delete:
-            super().delete()
+            return super().delete()
         else:
             return self.update(is_deleted=True, deleted_at=timezone.now())
 
@@ -43,10 +43,10 @@ class IsDeletedManager(GetOrNoneManager):
     Имеет метод, что бы достать все записи
     """
     def get_queryset(self):
-        return IsDeletedQuerySet(self.model).filter(is_deleted=False)
+        return self.unfiltered().filter(is_deleted=False)
 
     def unfiltered(self):
-        return IsDeletedManager(self.model)
+        return IsDeletedQuerySet(self.model, using=self._db)
 
     def hard_delete(self):
         return self.unfiltered().delete(hard_delete=True)
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:39
+
+import apps.common.models
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=64)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='archived_record_object_idx')],
+            },
+        ),
+    ]
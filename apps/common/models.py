@@ -1,11 +1,41 @@
+import os
+import time
 import uuid
 
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
 from apps.common.managers import GetOrNoneManager, IsDeletedManager
 
 
+def uuid7() -> uuid.UUID:
+    """
+    UUID версии 7 (RFC 9562): первые 48 бит - время в миллисекундах,
+    остальное - случайные биты. Новые id больше старых, поэтому
+    вставка идет в конец индекса первичного ключа
+    """
+    value = (time.time_ns() // 1_000_000) << 80
+    value |= int.from_bytes(os.urandom(10), 'big')
+    # Версия 7 и вариант RFC 4122
+    value = value & ~(0xF << 76) | (0x7 << 76)
+    value = value & ~(0x3 << 62) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def generate_id() -> uuid.UUID:
+    """
+    Значение по умолчанию для BaseModel.id. Если в настройках
+    UUID7_PRIMARY_KEYS = True, создается uuid7, иначе uuid4.
+    Оба вида id хранятся в одном и том же поле, так что старые записи
+    с uuid4 остаются как есть
+    """
+    if getattr(settings, 'UUID7_PRIMARY_KEYS', False):
+        return uuid7()
+    return uuid.uuid4()
+
+
 class BaseModel(models.Model):
     """
     Абстрактный класс модели, включающий в себя изменение id
@@ -17,7 +47,7 @@ class BaseModel(models.Model):
         updated_at (DateTimeField): Время обновления экземпляра
     """
 
-    id = models.UUIDField(default=uuid.uuid4,
+    id = models.UUIDField(default=generate_id,
                           unique=True,
                           primary_key=True,
                           db_index=True,
@@ -57,3 +87,32 @@ class IsDeletedModel(BaseModel):
 
     def hard_delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
+
+
+class ArchivedRecord(BaseModel):
+    """
+    Архивная копия записи, удаленной из своей таблицы командой
+    archive_deleted
+
+    Поля:
+        model (str): Модель записи в формате app_label.model_name
+        object_id (str): Первичный ключ записи
+        deleted_at (DateTimeField): Когда запись была помечена удаленной.
+                                    None у записей, удаленных каскадом
+        data (dict): Поля записи в формате сериализатора python
+        created_at (DateTimeField): Когда запись перенесена в архив
+    """
+
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id'],
+                         name='archived_record_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
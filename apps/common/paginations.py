@@ -1,6 +1,17 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class CustomCursorPagination(CursorPagination):
+    """
+    Пагинация по курсору (keyset). Не выполняет COUNT(*) и OFFSET,
+    поэтому время ответа не зависит от номера страницы.
+    Курсор строится по паре (created_at, id), для которой есть индекс
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
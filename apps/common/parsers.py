@@ -0,0 +1,37 @@
+import codecs
+import io
+import re
+
+from rest_framework.parsers import JSONParser
+
+from apps.common.renderers import ORJSONRenderer, orjson
+
+# 19 и больше цифр подряд: целое может не поместиться в 64 бита,
+# и orjson вернет float вместо int
+LONG_NUMBER_PATTERN = re.compile(rb'\d{19,}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser на orjson. Результат всегда тот же, что у JSONParser:
+    тело с длинными числами (целые шире 64 бит orjson превращает
+    во float) и тело, которое orjson не принял (1e400 - в json это inf,
+    одиночные суррогаты в строках), разбирает обычный JSONParser, он же
+    формирует ошибку разбора. Обычный JSONParser используется
+    и без orjson, для тела не в UTF-8 и с выключенным STRICT_JSON
+    (orjson не принимает NaN)
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if (orjson is None or not self.strict
+                or codecs.lookup(encoding).name != 'utf-8'):
+            return super().parse(stream, media_type, parser_context)
+        data = stream.read()
+        if not LONG_NUMBER_PATTERN.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(data), media_type, parser_context)
@@ -0,0 +1,48 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Типы, которые orjson не сериализует сам, передаются в encoder DRF,
+# чтобы даты, Decimal, QuerySet и т.д. выглядели так же, как раньше
+ORJSON_OPTIONS = 0 if orjson is None else orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Выдает те же байты, что и JSONRenderer:
+    компактные разделители, UTF-8 без экранирования, даты через
+    encoder DRF, экранированные \\u2028 и \\u2029.
+
+    Если orjson не установлен, нужен отступ (indent) или настройки
+    UNICODE_JSON/COMPACT_JSON отличаются от стандартных, рендеринг
+    выполняет обычный JSONRenderer. Он же используется, если orjson
+    не смог сериализовать данные (ключи не строки, очень большие int).
+
+    Отличия от json остаются только у float: NaN/Infinity orjson
+    выводит как null, а степень пишет без знака (1e16 вместо 1e+16)
+    """
+    default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=self.default,
+                               option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        # Как и JSONRenderer, экранируем U+2028 и U+2029, чтобы ответ
+        # оставался корректным JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
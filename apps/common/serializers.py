@@ -0,0 +1,58 @@
+from rest_framework import serializers
+
+
+def sparse_fields_from_request(request) -> dict:
+    """
+    Чтение параметров fields и exclude из запроса.
+    Значения передаются через запятую: ?fields=name,slug,price_current
+    """
+    params = {}
+    for param in ('fields', 'exclude'):
+        value = request.query_params.get(param)
+        if value:
+            params[param] = [name.strip() for name in value.split(',')
+                             if name.strip()]
+    return params
+
+
+class SparseFieldsMixin:
+    """
+    Миксин сериализатора с выбором полей (fields/exclude) и
+    построением запроса только под выбранные поля.
+
+    field_sources описывает, что нужно каждому полю сериализатора:
+    (колонки для only(), связи для select_related()).
+    Поле без описания берется из колонки с тем же названием
+    """
+    field_sources = {}
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = set(fields or ()) | set(exclude or ())
+        unknown = requested - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}'}
+            )
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    def optimize_queryset(self, queryset, extra_fields=()):
+        """
+        Ограничение запроса колонками и связями выбранных полей
+        """
+        columns, relations = set(extra_fields), set()
+        for name in self.fields:
+            field_columns, field_relations = self.field_sources.get(
+                name, ((name,), ())
+            )
+            columns.update(field_columns)
+            relations.update(field_relations)
+        # select_related() без аргументов подтянул бы все связи
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(columns))
@@ -0,0 +1,81 @@
+import io
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.common.parsers import ORJSONParser
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('Auth', 'User',
+                                             'auth@example.com', 'password')
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+
+    def test_user_is_not_cached_without_shared_cache(self):
+        self.assertEqual(self.client.get('/profiles/').status_code, 200)
+        # Изменение в другом процессе: сигнал сюда не доходит
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/profiles/').status_code, 401)
+
+    def test_profile_update_keeps_other_columns(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(
+            CACHES={'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}
+        ):
+            self.assertEqual(self.client.get('/profiles/').status_code, 200)
+            User.objects.filter(pk=self.user.pk).update(
+                account_type='SELLER'
+            )
+            response = self.client.put('/profiles/',
+                                       {'first_name': 'New',
+                                        'last_name': 'Name'},
+                                       format='json')
+            self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'New')
+        self.assertEqual(self.user.account_type, 'SELLER')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body.encode()), 'application/json',
+                            {'encoding': 'utf-8'})
+
+    def test_same_result_as_json_parser(self):
+        bodies = [
+            '{"name": "Телефон", "price": "10.00", "items": [1, 2.5]}',
+            '{"id": 18446744073709551615}',
+            '{"id": 123456789012345678901234567890}',
+            '{"id": -9223372036854775809}',
+            '{"phone": "12345678901234567890"}',
+            '{"value": 1.5e400}',
+            '"\\ud800"',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                expected = self.parse(JSONParser(), body)
+                actual = self.parse(ORJSONParser(), body)
+                self.assertEqual(actual, expected)
+                self.assertEqual(repr(actual), repr(expected))
+
+    def test_invalid_json_is_a_parse_error(self):
+        for body in ('{"a": 1}{', '{"a": NaN}', '{"a": Infinity}', ''):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError):
+                    self.parse(ORJSONParser(), body)
@@ -1,21 +1,43 @@
 import secrets
 import string
+import time
+from collections import Counter
+
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
 
-from apps.common.models import BaseModel
 from apps.reviews.models import Review
+from apps.shop.models import RATING_HISTOGRAM_FIELDS, Products
+
+CODE_CHARS = string.digits + string.ascii_uppercase
+CODE_TIME_LENGTH = 9
+CODE_RANDOM_LENGTH = 8
+
+
+def to_base36(number: int, length: int) -> str:
+    """
+    Число в base36 (0-9A-Z), дополненное нулями слева до length символов
+    """
+    chars = []
+    for _ in range(length):
+        number, remainder = divmod(number, 36)
+        chars.append(CODE_CHARS[remainder])
+    return ''.join(reversed(chars))
 
 
-def generate_unique_code(model: BaseModel, field: str) -> str:
+def generate_unique_code() -> str:
     """
-    Генерация уникального id
+    Генерация уникального кода без запросов к базе данных.
+    Первые 9 символов - время в миллисекундах, поэтому коды
+    упорядочены по времени создания. Остальные 8 - случайные:
+    36^8 вариантов на каждую миллисекунду, так что совпадение
+    практически невозможно, а если оно и случится, его поймает
+    уникальный индекс
     """
-    allowed_chars = string.ascii_uppercase + string.digits
-    unique_code = ''.join(secrets.choice(allowed_chars) for _ in range(12))
-    code = unique_code
-    similar_object_exists = model.objects.filter(**{field: code}).exists()
-    if not similar_object_exists:
-        return code
-    return generate_unique_code(model, field)
+    prefix = to_base36(time.time_ns() // 1_000_000, CODE_TIME_LENGTH)
+    suffix = ''.join(secrets.choice(CODE_CHARS)
+                     for _ in range(CODE_RANDOM_LENGTH))
+    return prefix + suffix
 
 
 def set_dict_attr(obj, data):
@@ -29,3 +51,33 @@ def set_dict_attr(obj, data):
 
 def avg_rating(data: list) -> float:
     return sum([i.rating for i in data]) / len(data)
+
+
+def update_product_rating(product_id, added: int = None,
+                          removed: int = None) -> int:
+    """
+    Изменение рейтинга и гистограммы оценок продукта одним
+    UPDATE-запросом.
+    added - оценка, которая добавляется в рейтинг,
+    removed - оценка, которая из рейтинга убирается.
+    При изменении отзыва передаются обе оценки
+    """
+    sum_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    histogram_delta = Counter()
+    if added is not None:
+        histogram_delta[added] += 1
+    if removed is not None:
+        histogram_delta[removed] -= 1
+    histogram = {
+        RATING_HISTOGRAM_FIELDS[value]:
+            F(RATING_HISTOGRAM_FIELDS[value]) + delta
+        for value, delta in histogram_delta.items() if delta
+    }
+    return Products.objects.filter(pk=product_id).update(
+        rating_sum=F('rating_sum') + sum_delta,
+        rating_count=F('rating_count') + count_delta,
+        rating_avg=(Cast(F('rating_sum') + sum_delta, FloatField())
+                    / NullIf(F('rating_count') + count_delta, 0)),
+        **histogram
+    )
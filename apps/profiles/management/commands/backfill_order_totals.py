@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from apps.profiles.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    """
+    Заполнение subtotal, total и item_count у заказов, оформленных до
+    появления этих полей. Заказы обрабатываются пачками по id: на пачку
+    один GROUP BY по позициям и один bulk_update
+    """
+    help = 'Заполнение сохраненных сумм у старых заказов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Количество заказов в пачке')
+
+    def handle(self, *args, **options):
+        orders = Order.objects.filter(
+            Q(subtotal__isnull=True)
+            | Q(total__isnull=True)
+            | Q(item_count__isnull=True)
+        ).order_by('id')
+        last_id = None
+        updated = 0
+        while True:
+            batch = orders if last_id is None else orders.filter(
+                id__gt=last_id
+            )
+            ids = list(batch.values_list('id', flat=True)[
+                :options['batch_size']
+            ])
+            if not ids:
+                break
+            last_id = ids[-1]
+            updated += self.backfill(ids)
+            self.stdout.write(f'Обработано заказов: {updated}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Суммы заполнены у {updated} заказов')
+        )
+
+    @transaction.atomic
+    def backfill(self, ids) -> int:
+        totals = {
+            row['order_id']: row
+            for row in OrderItem.objects.filter(
+                order_id__in=ids
+            ).order_by().values('order_id').annotate(
+                subtotal=Sum('total_price'),
+                item_count=Sum('quantity')
+            )
+        }
+        orders = []
+        for order_id in ids:
+            row = totals.get(order_id, {})
+            subtotal = row.get('subtotal') or Decimal('0.00')
+            orders.append(Order(id=order_id,
+                                subtotal=subtotal,
+                                total=subtotal,
+                                item_count=row.get('item_count') or 0))
+        return Order.objects.bulk_update(orders,
+                                         ['subtotal', 'total', 'item_count'])
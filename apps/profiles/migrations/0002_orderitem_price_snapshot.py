@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:18
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def snapshot_ordered_items(apps, schema_editor):
+    """
+    У уже оформленных заказов цены не сохранялись, поэтому для них
+    фиксируется текущая цена товара
+    """
+    OrderItem = apps.get_model('profiles', 'OrderItem')
+    Products = apps.get_model('shop', 'Products')
+    price = Products._base_manager.filter(
+        pk=OuterRef('product_id')
+    ).values('price_current')[:1]
+    OrderItem.objects.filter(order__isnull=False).update(
+        unit_price=Subquery(price),
+        total_price=Subquery(price) * models.F('quantity'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+        ('shop', '0007_products_bulk_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(snapshot_ordered_items,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:21
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_order_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='shippingaddress',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
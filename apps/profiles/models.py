@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
 
 from apps.common.models import BaseModel
 from apps.accounts.models import User
@@ -6,6 +7,13 @@ from apps.common.utils import generate_unique_code
 from apps.shop.models import Products
 
 
+# Сумма позиции заказа/корзины (цена товара * количество), считается в SQL
+LINE_TOTAL = ExpressionWrapper(
+    F('product__price_current') * F('quantity'),
+    output_field=DecimalField(max_digits=12, decimal_places=2)
+)
+
+
 class ShippingAddress(BaseModel):
     """
     Модель адреса доставки пользователя.
@@ -59,6 +67,9 @@ class Order(BaseModel):
                                         (DELIVERY_STATUS_CHOICES)
         payment_status (str/choices): Статус оплаты
                                       (PAYMENT_STATUS_CHOICES)
+        subtotal (Decimal): Сумма товаров, фиксируется при оформлении
+        total (Decimal): Итоговая сумма заказа
+        item_count (int): Количество товаров в заказе
 
         ---Адрес доставки---
         user (ForeignKey): Модель пользователя
@@ -92,6 +103,9 @@ class Order(BaseModel):
         ("FAILED", "FAILED"),
     )
 
+    # Сколько раз генерировать tx_ref заново при совпадении
+    TX_REF_ATTEMPTS = 3
+
     user = models.ForeignKey(User,
                              on_delete=models.CASCADE,
                              related_name='orders')
@@ -102,6 +116,17 @@ class Order(BaseModel):
     payment_status = models.CharField(max_length=20,
                                       default='PENDING',
                                       choices=PAYMENT_STATUS_CHOICES)
+    # Суммы заказа. У заказов, оформленных до их появления, - None,
+    # пока их не заполнит команда backfill_order_totals
+    subtotal = models.DecimalField(max_digits=12,
+                                   decimal_places=2,
+                                   null=True,
+                                   blank=True)
+    total = models.DecimalField(max_digits=12,
+                                decimal_places=2,
+                                null=True,
+                                blank=True)
+    item_count = models.PositiveIntegerField(null=True, blank=True)
 
     # Адрес пользователя. Все значение имеют null=True
     full_name = models.CharField(max_length=100, null=True)
@@ -122,23 +147,66 @@ class Order(BaseModel):
         """
         Переопределение метода save(). Если объект создается
         (self._state.adding), то с помощью функции генерации случайного кода
-        tx_ref присваивается этот код
+        tx_ref присваивается этот код. Уникальность не проверяется
+        заранее: при совпадении кода уникальный индекс выбросит
+        IntegrityError, и сохранение повторится с новым кодом
         """
-        if self._state.adding:
-            self.tx_ref = generate_unique_code(Order, 'tx_ref')
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        for attempt in range(self.TX_REF_ATTEMPTS):
+            self.tx_ref = generate_unique_code()
+            try:
+                # Точка сохранения, чтобы ошибка не прервала
+                # внешнюю транзакцию
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Повторяем, только если ошибка из-за совпавшего tx_ref
+                if (attempt == self.TX_REF_ATTEMPTS - 1
+                        or not Order.objects.filter(
+                            tx_ref=self.tx_ref).exists()):
+                    raise
 
     @property
     def get_cart_subtotal(self):
-        orderitems = self.orderitems.all()
-        total = sum([item.get_total for item in orderitems])
-        return total
+        if self.subtotal is not None:
+            return self.subtotal
+        # Старый заказ без сохраненных сумм. Суммы позиций
+        # зафиксированы при оформлении заказа
+        return self.sum_items('total_price')
 
     @property
     def get_total(self):
+        if self.total is not None:
+            return self.total
         total = self.get_cart_subtotal
         return total
 
+    @property
+    def get_item_count(self):
+        if self.item_count is not None:
+            return self.item_count
+        return self.sum_items('quantity')
+
+    def sum_items(self, field):
+        """
+        Сумма поля по позициям заказа. Если позиции уже загружены через
+        prefetch_related('orderitems'), запрос к базе не выполняется
+        """
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'orderitems' in prefetched:
+            return sum(getattr(item, field) or 0
+                       for item in prefetched['orderitems'])
+        total = self.orderitems.aggregate(total=Sum(field))['total']
+        return total or 0
+
+    class Meta:
+        indexes = [
+            # История заказов пользователя (пагинация по курсору)
+            models.Index(fields=['user', '-created_at', '-id'],
+                         name='orders_user_created_idx'),
+        ]
+
 
 class OrderItem(BaseModel):
     """
@@ -151,8 +219,13 @@ class OrderItem(BaseModel):
         order (ForeignKey): Заказ
         product (ForeignKey): Продукт
         quantity (int): Количество продуктов в заказе
+        unit_price (Decimal): Цена товара на момент оформления заказа.
+                              У товаров в корзине - None
+        total_price (Decimal): Сумма позиции на момент оформления
+                               заказа. У товаров в корзине - None
 
     Методы:
+        @property get_unit_price(): Цена товара в позиции
         @property get_total(): Вычисляет общую сумму продукта
         __str__(): Возвращает информацию о продукте в заказе
     """
@@ -168,12 +241,36 @@ class OrderItem(BaseModel):
                               blank=True)
     product = models.ForeignKey(Products, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10,
+                                     decimal_places=2,
+                                     null=True,
+                                     blank=True)
+    total_price = models.DecimalField(max_digits=12,
+                                      decimal_places=2,
+                                      null=True,
+                                      blank=True)
+
+    @property
+    def get_unit_price(self):
+        """
+        Цена товара в позиции. У оформленного заказа - цена на момент
+        оформления, в корзине - текущая цена товара
+        """
+        if self.unit_price is not None:
+            return self.unit_price
+        return self.product.price_current
 
     @property
     def get_total(self):
         """
-        Вычисляет общую сумму продукта
+        Вычисляет общую сумму продукта. У оформленного заказа берется
+        зафиксированная сумма, а если сумма уже посчитана в запросе
+        (annotate(line_total=LINE_TOTAL)), то она
         """
+        if self.total_price is not None:
+            return self.total_price
+        if hasattr(self, 'line_total'):
+            return self.line_total
         return self.product.price_current * self.quantity
 
     def __str__(self):
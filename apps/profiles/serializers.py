@@ -1,5 +1,9 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from apps.common.images import variant_urls
+
 
 class ProfileSerializer(serializers.Serializer):
     """
@@ -9,8 +13,13 @@ class ProfileSerializer(serializers.Serializer):
     last_name = serializers.CharField(max_length=255)
     email = serializers.EmailField(read_only=True)
     avatar = serializers.ImageField(required=False)
+    avatar_variants = serializers.SerializerMethodField()
     account_type = serializers.CharField(read_only=True)
 
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj.avatar, self.context.get('request'))
+
 
 class ShippingAddressSerializer(serializers.Serializer):
     """
@@ -1,11 +1,13 @@
 from django.urls import path
 
-from apps.profiles.views import (ProfileView,
+from apps.profiles.views import (OrdersView,
+                                 ProfileView,
                                  ShippingAddressView,
                                  ShippingAddressViewID)
 
 urlpatterns = [
     path('', ProfileView.as_view()),
+    path('orders/', OrdersView.as_view()),
     path('shipping_addresses/', ShippingAddressView.as_view()),
     path('shipping_addresses/detail/<uuid:id>/',
          ShippingAddressViewID.as_view())
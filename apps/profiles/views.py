@@ -1,12 +1,16 @@
+from django.db.models import Prefetch
 from drf_spectacular.utils import extend_schema
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.paginations import CustomCursorPagination
 from apps.common.permissions import IsOwner
 from apps.common.utils import set_dict_attr
-from apps.profiles.models import ShippingAddress
+from apps.profiles.models import Order, OrderItem, ShippingAddress
+from apps.profiles.schema_examples import ORDER_PARAM_EXAMPLE
 from apps.profiles.serializers import (ProfileSerializer,
                                        ShippingAddressSerializer)
+from apps.shop.serializers import OrderHistorySerializer
 
 tags = ['Profiles']
 
@@ -41,10 +45,9 @@ class ProfileView(APIView):
         """
         user = request.user
         serializer = self.serializer_class(data=request.data)
-        print(serializer)
         serializer.is_valid(raise_exception=True)
         user = set_dict_attr(user, serializer.validated_data)
-        user.save()
+        user.save(update_fields=[*serializer.validated_data, 'updated_at'])
         serializer = self.serializer_class(user)
         return Response(serializer.data, status=200)
 
@@ -59,10 +62,42 @@ class ProfileView(APIView):
         """
         user = request.user
         user.is_active = False
-        user.save()
+        user.save(update_fields=['is_active', 'updated_at'])
         return Response(data={'message': 'Аккаунт удален'})
 
 
+class OrdersView(APIView):
+    serializer_class = OrderHistorySerializer
+    pagination_class = CustomCursorPagination
+    permission_classes = [IsOwner]
+
+    @extend_schema(
+        summary='История заказов',
+        description='Заказы пользователя с товарами, от новых к старым. '
+                    'Пагинация по курсору',
+        tags=tags,
+        parameters=ORDER_PARAM_EXAMPLE,
+        responses=OrderHistorySerializer(many=True)
+    )
+    def get(self, request):
+        """
+        Получение заказов пользователя. Заказы загружаются одним
+        запросом, их товары - одним prefetch-запросом, поэтому число
+        запросов не зависит от количества заказов
+        """
+        orders = Order.objects.filter(user=request.user).select_related(
+            'user'
+        ).prefetch_related(Prefetch(
+            'orderitems',
+            queryset=OrderItem.objects.select_related('product',
+                                                      'product__seller')
+        ))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = self.serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class ShippingAddressView(APIView):
     serializer_class = ShippingAddressSerializer
     permission_classes = [IsOwner]
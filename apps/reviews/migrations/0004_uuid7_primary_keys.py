@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:21
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_alter_review_options_alter_review_unique_together'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_uuid7_primary_keys'),
+        ('shop', '0008_uuid7_primary_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['product', '-created_at', '-id'], name='reviews_live_product_idx'),
+        ),
+    ]
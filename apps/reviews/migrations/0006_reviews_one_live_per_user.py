@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Перед добавлением ограничения у каждого пользователя остается
+    один живой отзыв на товар - самый новый. Остальные помечаются
+    удаленными, и их оценки убираются из рейтинга товара
+    """
+    Review = apps.get_model('reviews', 'Review')
+    Products = apps.get_model('shop', 'Products')
+    live = Review._base_manager.filter(is_deleted=False)
+    duplicates = live.order_by().values('user_id', 'product_id').annotate(
+        total=Count('id')
+    ).filter(total__gt=1)
+    now = timezone.now()
+    for pair in duplicates:
+        extra = list(live.filter(
+            user_id=pair['user_id'], product_id=pair['product_id']
+        ).order_by('-created_at', '-id')[1:])
+        Review._base_manager.filter(
+            pk__in=[review.pk for review in extra]
+        ).update(is_deleted=True, deleted_at=now)
+        for review in extra:
+            field = f'rating_{review.rating}'
+            Products._base_manager.filter(pk=review.product_id).update(
+                rating_sum=F('rating_sum') - review.rating,
+                rating_count=F('rating_count') - 1,
+                rating_avg=(Cast(F('rating_sum') - review.rating,
+                                 FloatField())
+                            / NullIf(F('rating_count') - 1, 0)),
+                **{field: F(field) - 1}
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_reviews_live_product_idx'),
+        ('shop', '0009_products_rating_histogram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('user', 'product'), name='reviews_one_live_per_user'),
+        ),
+    ]
@@ -17,5 +17,20 @@ class Review(IsDeletedModel):
                                              MaxValueValidator(5)])
     text = models.TextField(null=True)
 
+    class Meta(IsDeletedModel.Meta):
+        indexes = [
+            # Отзывы товара, пагинация по курсору (-created_at, -id)
+            models.Index(fields=['product', '-created_at', '-id'],
+                         name='reviews_live_product_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
+        constraints = [
+            # Один живой отзыв пользователя на товар. Удаленных отзывов
+            # может быть сколько угодно
+            models.UniqueConstraint(fields=['user', 'product'],
+                                    name='reviews_one_live_per_user',
+                                    condition=models.Q(is_deleted=False)),
+        ]
+
     def __str__(self):
         return f'Review by {self.user}'
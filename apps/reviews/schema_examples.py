@@ -0,0 +1,16 @@
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+
+REVIEW_PARAM_EXAMPLE = [
+    OpenApiParameter(
+        name='cursor',
+        description='Курсор следующей или предыдущей страницы',
+        required=False,
+        type=OpenApiTypes.STR
+    ),
+    OpenApiParameter(
+        name='page_size',
+        description='Количество отзывов на странице',
+        required=False,
+        type=OpenApiTypes.INT
+    ),
+]
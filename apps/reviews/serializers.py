@@ -1,4 +1,5 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from apps.profiles.serializers import ProfileSerializer
@@ -13,6 +14,52 @@ class ReviewSerializer(serializers.Serializer):
     text = serializers.CharField(allow_null=True)
 
 
+class ReviewUserSerializer(serializers.Serializer):
+    """
+    Краткая информация об авторе отзыва
+    """
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    avatar = serializers.ImageField()
+
+
+class ReviewProductSerializer(serializers.Serializer):
+    """
+    Краткая информация о товаре для списка отзывов
+    """
+    name = serializers.CharField()
+    slug = serializers.SlugField()
+    rating = serializers.SerializerMethodField()
+    rating_count = serializers.IntegerField()
+
+    @extend_schema_field(serializers.FloatField(allow_null=True))
+    def get_rating(self, obj):
+        if obj.rating_count:
+            return round(obj.rating_avg, 1)
+        return None
+
+
+class ReviewListSerializer(serializers.Serializer):
+    """
+    Отзыв в списке отзывов товара. Товар в отзыве не повторяется
+    """
+    id = serializers.UUIDField()
+    user = ReviewUserSerializer()
+    rating = serializers.IntegerField()
+    text = serializers.CharField(allow_null=True)
+    created_at = serializers.DateTimeField()
+
+
+class ProductReviewsSerializer(serializers.Serializer):
+    """
+    Страница отзывов товара: товар один раз и отзывы
+    """
+    product = ReviewProductSerializer()
+    next = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    results = ReviewListSerializer(many=True)
+
+
 class CreateReviewSerializer(serializers.Serializer):
     rating = serializers.IntegerField(validators=[MinValueValidator(1),
                                                   MaxValueValidator(5)])
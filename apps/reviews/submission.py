@@ -0,0 +1,43 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Subquery
+from django.utils import timezone
+
+from apps.common.utils import update_product_rating
+from apps.reviews.models import Review
+
+
+class ReviewExists(Exception):
+    pass
+
+
+@transaction.atomic
+def submit_review(user, product, rating: int, text: str = None) -> Review:
+    """
+    Создание отзыва пользователя на товар. Если у пользователя есть
+    удаленный отзыв на этот товар, он восстанавливается с новыми
+    данными, а не создается вторая строка.
+    Проверки "отзыва еще нет" перед записью нет: второй живой отзыв
+    не дает создать условное ограничение reviews_one_live_per_user,
+    и тогда выбрасывается ReviewExists
+    """
+    now = timezone.now()
+    deleted = Review._base_manager.filter(
+        user=user, product=product, is_deleted=True
+    ).order_by(F('deleted_at').desc(nulls_last=True), '-id').values('pk')[:1]
+    try:
+        with transaction.atomic():
+            # is_deleted=True проверяется и у самой строки, чтобы два
+            # параллельных запроса не восстановили один отзыв дважды
+            revived = Review._base_manager.filter(
+                pk=Subquery(deleted), is_deleted=True
+            ).update(is_deleted=False, deleted_at=None, rating=rating,
+                     text=text, created_at=now, updated_at=now)
+            if revived:
+                review = Review.objects.get(user=user, product=product)
+            else:
+                review = Review.objects.create(user=user, product=product,
+                                               rating=rating, text=text)
+    except IntegrityError:
+        raise ReviewExists
+    update_product_rating(product.id, added=rating)
+    return review
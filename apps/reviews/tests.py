@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.reviews.models import Review
+from apps.sellers.models import Seller
+from apps.shop.models import Category, Products
+
+
+class SubmitReviewTests(TestCase):
+    def setUp(self):
+        seller_user = User.objects.create_user('Review', 'Seller',
+                                               'seller@example.com',
+                                               'password',
+                                               account_type='SELLER')
+        seller = Seller.objects.create(
+            user=seller_user, business_name='Review shop',
+            inn_identification_number='1', phone_number='1',
+            business_description='-', business_address='-', city='-',
+            postal_code='1', bank_name='-', bank_bic_number='1',
+            bank_account_number='1', bank_routing_number='1',
+            is_approved=True
+        )
+        category = Category.objects.create(name='Phones',
+                                           image='category_images/x.jpg')
+        self.product = Products.objects.create(
+            seller=seller, category=category, name='Phone', desc='-',
+            price_current=Decimal('10.00'), image1='products_image/x.jpg'
+        )
+        self.user = User.objects.create_user('Buyer', 'User',
+                                             'buyer@example.com',
+                                             'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/reviews/{self.product.slug}/'
+
+    def post_review(self, rating):
+        return self.client.post(self.url, {'rating': rating, 'text': 'ok'},
+                                format='json')
+
+    def test_second_live_review_is_rejected(self):
+        self.assertEqual(self.post_review(5).status_code, 201)
+        response = self.post_review(1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Review.objects.filter(user=self.user).count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count,
+                          self.product.rating_sum), (1, 5))
+
+    def test_deleted_review_is_revived(self):
+        self.post_review(5)
+        review_id = Review.objects.get(user=self.user).id
+        response = self.client.delete(f'/reviews/single_review/{review_id}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.post_review(2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Review._base_manager.get().id, review_id)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count,
+                          self.product.rating_sum), (1, 2))
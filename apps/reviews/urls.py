@@ -1,8 +1,11 @@
 from django.urls import path
 
-from apps.reviews.views import ReviewsAPIView, SingleReviewAPIView
+from apps.reviews.views import (ProductReviewsView,
+                                ReviewsAPIView,
+                                SingleReviewAPIView)
 
 urlpatterns = [
     path('<slug:product_slug>/', ReviewsAPIView.as_view()),
-    path('single_review/<str:review_id>/', SingleReviewAPIView.as_view())
+    path('products/<slug:product_slug>/', ProductReviewsView.as_view()),
+    path('single_review/<uuid:review_id>/', SingleReviewAPIView.as_view())
 ]
@@ -1,13 +1,20 @@
+from django.db import transaction
 from drf_spectacular.utils import extend_schema
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.paginations import CustomCursorPagination
 from apps.common.permissions import IsOwner
-from apps.common.utils import set_dict_attr
+from apps.common.utils import set_dict_attr, update_product_rating
 from apps.reviews.models import Review
+from apps.reviews.schema_examples import REVIEW_PARAM_EXAMPLE
 from apps.reviews.serializers import (CreateReviewSerializer,
+                                      ProductReviewsSerializer,
+                                      ReviewListSerializer,
+                                      ReviewProductSerializer,
                                       ReviewSerializer)
+from apps.reviews.submission import ReviewExists, submit_review
 from apps.shop.models import Products
 
 tags = ['Reviews']
@@ -18,7 +25,7 @@ class ReviewsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self, slug):
-        return Products.objects.get(slug=slug)
+        return Products.objects.get_or_none(slug=slug)
 
     @extend_schema(
         summary='Получение отзывов',
@@ -37,7 +44,9 @@ class ReviewsAPIView(APIView):
 
     @extend_schema(
         summary='Создание комментария',
-        description='Не забудьте передать slug продукта',
+        description='Не забудьте передать slug продукта. Удаленный отзыв '
+                    'пользователя на этот товар восстанавливается с новыми '
+                    'данными. Если живой отзыв уже есть, возвращается 409',
         tags=tags
     )
     def post(self, request, *args, **kwargs):
@@ -46,27 +55,71 @@ class ReviewsAPIView(APIView):
             return Response({'message': 'Product not found'},
                             status=404)
 
-        if Review.objects.filter(user=request.user,
-                                 product=product,
-                                 is_deleted=False).exists():
-            return Response({'message': 'Вы уже оставили отзыв на этот продукт'})
-
         serializer = CreateReviewSerializer(data=request.data)
         if serializer.is_valid():
-            review = Review.objects.create(user=request.user,
-                                           product=product,
-                                           **serializer.validated_data)
+            try:
+                review = submit_review(request.user, product,
+                                       **serializer.validated_data)
+            except ReviewExists:
+                return Response(
+                    {'message': 'Вы уже оставили отзыв на этот продукт'},
+                    status=409
+                )
             serializer = self.serializer_class(review)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
+class ProductReviewsView(APIView):
+    serializer_class = ReviewListSerializer
+    pagination_class = CustomCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary='Список отзывов товара',
+        description='Отзывы товара от новых к старым с пагинацией по '
+                    'курсору. Товар возвращается один раз, автор отзыва - '
+                    'кратко',
+        tags=tags,
+        parameters=REVIEW_PARAM_EXAMPLE,
+        responses=ProductReviewsSerializer
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Два запроса независимо от количества отзывов: товар
+        и страница отзывов вместе с авторами
+        """
+        product = Products.objects.only(
+            'name', 'slug', 'rating_avg', 'rating_count'
+        ).get_or_none(slug=kwargs.get('product_slug'))
+        if not product:
+            return Response({'message': 'Product not found'},
+                            status=404)
+
+        reviews = Review.objects.filter(product=product).select_related(
+            'user'
+        ).only('rating', 'text', 'created_at', 'user__first_name',
+               'user__last_name', 'user__avatar')
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(reviews, request, view=self)
+        serializer = self.serializer_class(page, many=True)
+        return Response({
+            'product': ReviewProductSerializer(product).data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': serializer.data,
+        }, status=200)
+
+
 class SingleReviewAPIView(APIView):
     serializer_class = ReviewSerializer
     permission_classes = [IsOwner]
 
-    def get_object(self, pk):
-        return Review.objects.get(pk=pk)
+    def get_object(self, pk, for_update=False):
+        queryset = Review.objects.all()
+        if for_update:
+            queryset = queryset.select_for_update()
+        return queryset.get_or_none(pk=pk)
 
     @extend_schema(
         summary='Получение отзыва',
@@ -77,7 +130,7 @@ class SingleReviewAPIView(APIView):
         review = self.get_object(kwargs.get('review_id'))
         if not review:
             return Response({'message': 'Review not found'},
-                            status=400)
+                            status=404)
         serializer = self.serializer_class(review)
         return Response(serializer.data, status=200)
 
@@ -86,17 +139,22 @@ class SingleReviewAPIView(APIView):
         description='Обновление комментария по id',
         tags=tags
     )
+    @transaction.atomic
     def put(self, request, *args, **kwargs):
-        review = self.get_object(kwargs.get('review_id'))
+        review = self.get_object(kwargs.get('review_id'), for_update=True)
         if not review:
             return Response({'message': 'Review not found'},
-                            status=400)
+                            status=404)
 
         serializer = CreateReviewSerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
+            old_rating = review.rating
             updated_review = set_dict_attr(review, data)
             updated_review.save()
+            update_product_rating(updated_review.product_id,
+                                  added=updated_review.rating,
+                                  removed=old_rating)
             serializer = self.serializer_class(updated_review)
             return Response(serializer.data, status=200)
         return Response(serializer.errors, status=400)
@@ -106,12 +164,13 @@ class SingleReviewAPIView(APIView):
         description='Удаление комментария по id',
         tags=tags
     )
+    @transaction.atomic
     def delete(self, request, *args, **kwargs):
-        review = self.get_object(kwargs.get('review_id'))
+        review = self.get_object(kwargs.get('review_id'), for_update=True)
         if not review:
             return Response({'message': 'Review not found'},
-                            status=400)
+                            status=404)
 
-        review.is_deleted = True
-        review.save()
+        review.delete()
+        update_product_rating(review.product_id, removed=review.rating)
         return Response(status=204)
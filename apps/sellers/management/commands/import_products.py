@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sellers.models import Seller
+from apps.shop.importers import (IMPORT_BATCH_SIZE,
+                                 IMPORT_FORMATS,
+                                 ProductImporter,
+                                 detect_format)
+
+
+class Command(BaseCommand):
+    """
+    Массовый импорт товаров продавца из CSV или NDJSON файла
+    """
+    help = 'Импорт товаров продавца из CSV/NDJSON файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('seller_slug', help='slug продавца')
+        parser.add_argument('path', help='Путь к файлу')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Формат файла. По умолчанию '
+                                 'определяется по расширению')
+        parser.add_argument('--batch-size', type=int,
+                            default=IMPORT_BATCH_SIZE,
+                            help='Количество товаров в одной транзакции')
+
+    def handle(self, *args, **options):
+        seller = Seller.objects.filter(slug=options['seller_slug']).first()
+        if not seller:
+            raise CommandError('Продавец не найден')
+
+        import_format = options['format'] or detect_format(options['path'])
+        importer = ProductImporter(seller, batch_size=options['batch_size'])
+        with open(options['path'], 'rb') as stream:
+            result = importer.run(stream, import_format)
+
+        for error in result['errors']:
+            self.stderr.write(f"Строка {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано товаров: {result['created']} из {result['total']}"
+        ))
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from apps.profiles.models import Order
+from apps.sellers.models import SalesRollup
+from apps.sellers.rollups import compute_rollups, split_days
+
+
+def compute_chunk(chunk) -> list:
+    """
+    Пересчет одного отрезка дней в отдельном потоке.
+    У каждого потока свое соединение с базой, его нужно закрыть
+    """
+    try:
+        return compute_rollups(*chunk)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Полный пересчет продаж продавцов (SalesRollup) по заказам.
+    История делится на отрезки по --chunk-days дней, которые
+    считаются параллельно. Затем таблица заменяется в одной транзакции.
+    Заказы, оформленные во время пересчета, могут в него не попасть,
+    поэтому команду лучше запускать при низкой нагрузке
+    """
+    help = 'Пересчет продаж продавцов по заказам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Количество параллельных потоков')
+        parser.add_argument('--chunk-days', type=int, default=30,
+                            help='Количество дней в одном отрезке')
+
+    def handle(self, *args, **options):
+        bounds = Order.objects.aggregate(first=Min('created_at'),
+                                         last=Max('created_at'))
+        rollups = []
+        if bounds['first'] is not None:
+            chunks = split_days(timezone.localdate(bounds['first']),
+                                timezone.localdate(bounds['last']),
+                                options['chunk_days'])
+            with ThreadPoolExecutor(options['workers']) as executor:
+                for chunk_rollups in executor.map(compute_chunk, chunks):
+                    rollups.extend(chunk_rollups)
+            self.stdout.write(f'Отрезков посчитано: {len(chunks)}')
+
+        with transaction.atomic():
+            SalesRollup.objects.all().delete()
+            SalesRollup.objects.bulk_create(rollups, batch_size=1000)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Строк продаж записано: {len(rollups)}')
+        )
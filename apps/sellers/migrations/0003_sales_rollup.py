@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0002_uuid7_primary_keys'),
+        ('shop', '0008_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_paid', models.IntegerField(default=0)),
+                ('revenue_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.products')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='sellers.seller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller', 'day'], name='sales_rollup_seller_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('seller', 'product', 'day'), name='sales_rollup_unique')],
+            },
+        ),
+    ]
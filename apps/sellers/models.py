@@ -69,3 +69,54 @@ class Seller(BaseModel):
         Возвращает информацию о продавце
         """
         return f'Продавец {self.business_name}'
+
+
+class SalesRollup(models.Model):
+    """
+    Продажи товара продавца за день. Обновляется при оформлении заказа
+    и при изменении статуса оплаты (apps.sellers.rollups), полностью
+    пересчитывается командой rebuild_sales_rollups.
+    День - дата создания заказа
+
+    Поля:
+        seller (ForeignKey): Продавец
+        product (ForeignKey): Товар
+        day (date): День
+        units_sold (int): Продано штук (без отмененных и неоплаченных
+                          с ошибкой заказов)
+        revenue (Decimal): Выручка по тем же заказам
+        units_paid (int): Продано штук в оплаченных заказах
+        revenue_paid (Decimal): Выручка по оплаченным заказам
+    """
+
+    seller = models.ForeignKey(Seller,
+                               on_delete=models.CASCADE,
+                               related_name='sales_rollups')
+    product = models.ForeignKey('shop.Products',
+                                on_delete=models.CASCADE,
+                                related_name='+')
+    day = models.DateField()
+    units_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14,
+                                  decimal_places=2,
+                                  default=0)
+    units_paid = models.IntegerField(default=0)
+    revenue_paid = models.DecimalField(max_digits=14,
+                                       decimal_places=2,
+                                       default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'product', 'day'],
+                                    name='sales_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'day'],
+                         name='sales_rollup_seller_day_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Возвращает информацию о продажах
+        """
+        return f'Продажи {self.product_id} за {self.day}'
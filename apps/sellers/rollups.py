@@ -0,0 +1,166 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.db.models import DecimalField, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.profiles.models import OrderItem
+from apps.sellers.models import SalesRollup
+
+# Заказы с этими статусами оплаты в продажи (units_sold, revenue)
+# не входят, а в оплаченные продажи входит только PAID_STATUS
+EXCLUDED_STATUSES = ('CANCELLED', 'FAILED')
+PAID_STATUS = 'SUCCESSFUL'
+
+ROLLUP_COLUMNS = ('seller', 'product', 'day', 'units_sold', 'revenue',
+                  'units_paid', 'revenue_paid')
+ROLLUP_METRICS = ROLLUP_COLUMNS[3:]
+
+
+def is_sold(payment_status) -> bool:
+    return payment_status not in EXCLUDED_STATUSES
+
+
+def is_paid(payment_status) -> bool:
+    return payment_status == PAID_STATUS
+
+
+def get_upsert_sql() -> str:
+    """
+    INSERT ... ON CONFLICT DO UPDATE, который прибавляет значения
+    к существующей строке. Поддерживается SQLite и PostgreSQL
+    """
+    table = SalesRollup._meta.db_table
+    columns = [SalesRollup._meta.get_field(name).column
+               for name in ROLLUP_COLUMNS]
+    updates = ', '.join(f'{name} = {table}.{name} + excluded.{name}'
+                        for name in ROLLUP_METRICS)
+    return (
+        f'INSERT INTO {table} ({", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}) '
+        f'ON CONFLICT ({", ".join(columns[:3])}) DO UPDATE SET {updates}'
+    )
+
+
+def add_to_rollups(rows):
+    """
+    Прибавляет значения к строкам rollup-таблицы, создавая
+    недостающие. rows: кортежи значений в порядке ROLLUP_COLUMNS.
+    Строки, в которых после вычитания все значения стали нулевыми,
+    удаляются: полный пересчет (compute_rollups) таких строк не создает
+    """
+    fields = [SalesRollup._meta.get_field(name) for name in ROLLUP_COLUMNS]
+    params = [
+        [field.get_db_prep_save(value, connection)
+         for field, value in zip(fields, row)]
+        for row in rows
+    ]
+    if params:
+        with connection.cursor() as cursor:
+            cursor.executemany(get_upsert_sql(), params)
+
+    emptied = Q()
+    for row in rows:
+        if any(value < 0 for value in row[3:]):
+            emptied |= Q(seller_id=row[0], product_id=row[1], day=row[2])
+    if emptied:
+        SalesRollup.objects.filter(
+            emptied, **{name: 0 for name in ROLLUP_METRICS}
+        ).delete()
+
+
+def apply_order(order, sold_sign: int, paid_sign: int):
+    """
+    Добавляет (знак 1) или вычитает (знак -1) позиции заказа из продаж.
+    Позиции группируются по товару одним запросом
+    """
+    if not sold_sign and not paid_sign:
+        return
+    lines = OrderItem.objects.filter(
+        order_id=order.pk, product__seller__isnull=False
+    ).order_by().values('product_id', 'product__seller_id').annotate(
+        units=Sum('quantity'), amount=Sum('total_price')
+    )
+    day = timezone.localdate(order.created_at)
+    add_to_rollups([
+        (line['product__seller_id'], line['product_id'], day,
+         line['units'] * sold_sign, (line['amount'] or 0) * sold_sign,
+         line['units'] * paid_sign, (line['amount'] or 0) * paid_sign)
+        for line in lines
+    ])
+
+
+def record_checkout(order):
+    """
+    Добавляет в продажи только что оформленный заказ
+    """
+    apply_order(order,
+                int(is_sold(order.payment_status)),
+                int(is_paid(order.payment_status)))
+
+
+def record_payment_status_change(order, old_status):
+    """
+    Переносит заказ между продажами и оплаченными продажами
+    при изменении статуса оплаты
+    """
+    new_status = order.payment_status
+    apply_order(order,
+                is_sold(new_status) - is_sold(old_status),
+                is_paid(new_status) - is_paid(old_status))
+
+
+def compute_rollups(start_day, end_day) -> list:
+    """
+    Продажи за дни [start_day, end_day), посчитанные заново по заказам.
+    Возвращает несохраненные объекты SalesRollup
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(start_day, time.min, tzinfo=tz)
+    end = datetime.combine(end_day, time.min, tzinfo=tz)
+    sold = ~Q(order__payment_status__in=EXCLUDED_STATUSES)
+    paid = Q(order__payment_status=PAID_STATUS)
+
+    def total(field, condition, output_field):
+        return Coalesce(Sum(field, filter=condition), Value(0),
+                        output_field=output_field)
+
+    rows = OrderItem.objects.filter(
+        order__created_at__gte=start,
+        order__created_at__lt=end,
+        product__seller__isnull=False,
+    ).annotate(
+        day=TruncDate('order__created_at')
+    ).order_by().values('product__seller_id', 'product_id', 'day').annotate(
+        units_sold=total('quantity', sold, IntegerField()),
+        revenue=total('total_price', sold, DecimalField()),
+        units_paid=total('quantity', paid, IntegerField()),
+        revenue_paid=total('total_price', paid, DecimalField()),
+    )
+    return [
+        SalesRollup(seller_id=row['product__seller_id'],
+                    product_id=row['product_id'],
+                    day=row['day'],
+                    units_sold=row['units_sold'],
+                    revenue=row['revenue'],
+                    units_paid=row['units_paid'],
+                    revenue_paid=row['revenue_paid'])
+        for row in rows
+        if any(row[name] for name in ROLLUP_METRICS)
+    ]
+
+
+def split_days(first_day, last_day, chunk_days: int) -> list:
+    """
+    Делит дни от first_day до last_day включительно на отрезки
+    [начало, конец) по chunk_days дней
+    """
+    chunks = []
+    start = first_day
+    while start <= last_day:
+        end = min(start + timedelta(days=chunk_days),
+                  last_day + timedelta(days=1))
+        chunks.append((start, end))
+        start = end
+    return chunks
@@ -0,0 +1,16 @@
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+
+SALES_PARAM_EXAMPLE = [
+    OpenApiParameter(
+        name='date_from',
+        description='Начало периода (по умолчанию 30 дней назад)',
+        required=False,
+        type=OpenApiTypes.DATE
+    ),
+    OpenApiParameter(
+        name='date_to',
+        description='Конец периода включительно (по умолчанию сегодня)',
+        required=False,
+        type=OpenApiTypes.DATE
+    ),
+]
@@ -22,3 +22,66 @@ class SellerSerializer(serializers.Serializer):
     bank_routing_number = serializers.CharField(max_length=50)
 
     is_approved = serializers.BooleanField(read_only=True)
+
+
+class ImportProductsSerializer(serializers.Serializer):
+    """
+    Сериализатор файла для массового импорта товаров
+    """
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=('csv', 'ndjson'),
+                                     required=False)
+
+
+class SalesQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для валидации периода аналитики продаж
+    """
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_from = attrs.get('date_from')
+        date_to = attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                'date_from не может быть позже date_to'
+            )
+        return attrs
+
+
+class SalesTotalsSerializer(serializers.Serializer):
+    """
+    Сериализатор показателей продаж
+    """
+    units_sold = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    units_paid = serializers.IntegerField()
+    revenue_paid = serializers.DecimalField(max_digits=14,
+                                            decimal_places=2)
+
+
+class SalesDaySerializer(SalesTotalsSerializer):
+    """
+    Сериализатор продаж за день
+    """
+    day = serializers.DateField()
+
+
+class SalesProductSerializer(SalesTotalsSerializer):
+    """
+    Сериализатор продаж товара за период
+    """
+    slug = serializers.CharField(source='product__slug')
+    name = serializers.CharField(source='product__name')
+
+
+class SellerSalesSerializer(serializers.Serializer):
+    """
+    Сериализатор аналитики продаж продавца за период
+    """
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    totals = SalesTotalsSerializer()
+    days = SalesDaySerializer(many=True)
+    products = SalesProductSerializer(many=True)
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.authentication import invalidate_user_cache
+from apps.profiles.models import Order
+from apps.sellers.models import Seller
+from apps.sellers.rollups import record_payment_status_change
+
+
+@receiver(pre_save, sender=Order)
+def remember_payment_status(sender, instance, update_fields=None,
+                            **kwargs):
+    """
+    Запоминает статус оплаты заказа до сохранения, чтобы после
+    сохранения перенести заказ в нужную часть продаж
+    """
+    instance._old_payment_status = None
+    if instance._state.adding or (update_fields is not None
+                                  and 'payment_status' not in update_fields):
+        return
+    instance._old_payment_status = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('payment_status', flat=True).first()
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollups(sender, instance, created, **kwargs):
+    """
+    Обновление продаж продавцов при изменении статуса оплаты.
+    Новый заказ добавляется в продажи при оформлении (place_order)
+    """
+    old_status = instance._old_payment_status
+    if (not created and old_status is not None
+            and old_status != instance.payment_status):
+        record_payment_status_change(instance, old_status)
+
+
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+def invalidate_cached_seller(sender, instance, **kwargs):
+    """
+    Профиль продавца хранится в кеше аутентификации вместе
+    с пользователем (request.user.seller), поэтому сбрасывается и он
+    """
+    invalidate_user_cache(instance.user_id)
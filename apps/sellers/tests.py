@@ -0,0 +1,78 @@
+import io
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from apps.accounts.models import User
+from apps.profiles.models import OrderItem
+from apps.sellers.models import SalesRollup, Seller
+from apps.shop.cart import place_order
+from apps.shop.models import Category, Products
+
+
+class SalesRollupTests(TransactionTestCase):
+    """
+    Пересчет rebuild_sales_rollups должен давать ту же таблицу,
+    что и инкрементальное обновление при оформлении и смене статуса.
+    TransactionTestCase, потому что пересчет идет в других потоках
+    со своими соединениями
+    """
+
+    def setUp(self):
+        self.buyer = User.objects.create_user('Buyer', 'User',
+                                              'buyer@example.com',
+                                              'password')
+        seller_user = User.objects.create_user('Seller', 'User',
+                                               'seller@example.com',
+                                               'password',
+                                               account_type='SELLER')
+        seller = Seller.objects.create(
+            user=seller_user, business_name='Rollup shop',
+            inn_identification_number='1', phone_number='1',
+            business_description='-', business_address='-', city='-',
+            postal_code='1', bank_name='-', bank_bic_number='1',
+            bank_account_number='1', bank_routing_number='1',
+            is_approved=True
+        )
+        category = Category.objects.create(name='Phones',
+                                           image='category_images/x.jpg')
+        self.products = [
+            Products.objects.create(seller=seller, category=category,
+                                    name=name, desc='-',
+                                    price_current=Decimal(price),
+                                    image1='products_image/x.jpg')
+            for name, price in (('Phone', '10.00'), ('Case', '2.50'))
+        ]
+
+    def buy(self, *quantities):
+        OrderItem.objects.bulk_create([
+            OrderItem(user=self.buyer, product=product, quantity=quantity)
+            for product, quantity in zip(self.products, quantities)
+            if quantity
+        ])
+        return place_order(self.buyer, full_name='Buyer User',
+                           email='buyer@example.com', phone='1',
+                           address='-', city='-', country='-', zipcode=1)
+
+    def snapshot(self):
+        return sorted(SalesRollup.objects.values_list(
+            'seller_id', 'product_id', 'day', 'units_sold', 'revenue',
+            'units_paid', 'revenue_paid'
+        ))
+
+    def test_rebuild_matches_incremental_after_cancellation(self):
+        paid = self.buy(2, 0)
+        paid.payment_status = 'SUCCESSFUL'
+        paid.save()
+        # Единственный заказ второго товара отменяется, его строка
+        # в продажах обнуляется и должна исчезнуть
+        cancelled = self.buy(0, 3)
+        cancelled.payment_status = 'CANCELLED'
+        cancelled.save()
+
+        incremental = self.snapshot()
+        self.assertEqual(len(incremental), 1)
+        call_command('rebuild_sales_rollups', workers=1,
+                     stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
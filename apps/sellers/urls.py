@@ -1,10 +1,15 @@
 from django.urls import path
 
 from apps.sellers.views import (SellerView,
-                                ProductsBySellerView, SellerProductView)
+                                ProductsBySellerView,
+                                ImportProductsView,
+                                SellerProductView,
+                                SellerSalesView)
 
 urlpatterns = [
     path('', SellerView.as_view()),
     path("products/", ProductsBySellerView.as_view()),
+    path("products/import/", ImportProductsView.as_view()),
+    path('analytics/', SellerSalesView.as_view()),
     path('products/detail/<str:slug>/', SellerProductView.as_view())
 ]
@@ -1,12 +1,24 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.common.permissions import IsSeller
 from apps.common.utils import set_dict_attr
-from apps.sellers.models import Seller
-from apps.sellers.serializers import SellerSerializer
+from apps.sellers.models import SalesRollup, Seller
+from apps.sellers.rollups import ROLLUP_METRICS
+from apps.sellers.schema_examples import SALES_PARAM_EXAMPLE
+from apps.sellers.serializers import (ImportProductsSerializer,
+                                      SalesQuerySerializer,
+                                      SellerSalesSerializer,
+                                      SellerSerializer)
+from apps.shop.importers import ProductImporter, detect_format
+from apps.shop.mixins import ProductListMixin
 from apps.shop.models import Products, Category
+from apps.shop.schema_examples import PRODUCT_PARAM_EXAMPLE
 from apps.shop.serializers import ProductSerializer, CreateProductSerializer
 
 tags = ['Sellers']
@@ -35,13 +47,13 @@ class SellerView(APIView):
             seller, _ = Seller.objects.update_or_create(user=user,
                                                         defaults=data)
             user.account_type = 'SELLER'
-            user.save()
+            user.save(update_fields=['account_type', 'updated_at'])
             serializer = self.serializer_class(seller)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
-class ProductsBySellerView(APIView):
+class ProductsBySellerView(ProductListMixin, APIView):
     serializer_class = ProductSerializer
     permission_classes = [IsSeller]
 
@@ -49,6 +61,7 @@ class ProductsBySellerView(APIView):
         summary="Получение товаров",
         description="Получение всех товаров продавца",
         tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE
     )
     def get(self, request, *args, **kwargs):
         """
@@ -61,8 +74,7 @@ class ProductsBySellerView(APIView):
             "seller",
             "seller__user"
         ).filter(seller=seller)
-        serializer = self.serializer_class(products, many=True)
-        return Response(data=serializer.data, status=200)
+        return self.get_paginated_products(request, products)
 
     @extend_schema(
         summary="Создание товара",
@@ -98,6 +110,41 @@ class ProductsBySellerView(APIView):
         return Response(serializer.errors, status=400)
 
 
+class ImportProductsView(APIView):
+    serializer_class = ImportProductsSerializer
+    permission_classes = [IsSeller]
+
+    @extend_schema(
+        summary='Импорт товаров',
+        description='Массовое создание товаров из CSV или NDJSON файла. '
+                    'Колонки: name, desc, price_current, price_old, '
+                    'category_slug, in_stock, image1, image2, image3',
+        tags=tags,
+        request={'multipart/form-data': ImportProductsSerializer}
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Импорт товаров авторизованного продавца.
+        Строки с ошибками пропускаются и возвращаются в ответе
+        """
+        if request.user.seller.is_approved is False:
+            return Response(
+                data={"message": "Пользователь не является продавцом"},
+                status=404
+            )
+
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        import_format = (serializer.validated_data.get('format')
+                         or detect_format(upload.name))
+
+        importer = ProductImporter(request.user.seller)
+        result = importer.run(upload.file, import_format)
+        status = 201 if result['created'] else 400
+        return Response(result, status=status)
+
+
 class SellerProductView(APIView):
     serializer_class = CreateProductSerializer
     permission_classes = [IsSeller]
@@ -151,3 +198,50 @@ class SellerProductView(APIView):
 
         product.delete()
         return Response({'message': 'Товар удален'}, status=204)
+
+
+class SellerSalesView(APIView):
+    serializer_class = SellerSalesSerializer
+    permission_classes = [IsSeller]
+    default_period = timedelta(days=29)
+
+    @extend_schema(
+        summary='Аналитика продаж',
+        description='Проданные штуки и выручка продавца по дням и по '
+                    'товарам за период. Отмененные и неоплаченные с '
+                    'ошибкой заказы не учитываются, отдельно показаны '
+                    'оплаченные продажи',
+        tags=tags,
+        parameters=SALES_PARAM_EXAMPLE
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Продажи читаются только из таблицы SalesRollup
+        """
+        serializer = SalesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        date_to = serializer.validated_data.get('date_to',
+                                                timezone.localdate())
+        date_from = serializer.validated_data.get(
+            'date_from', date_to - self.default_period
+        )
+
+        rollups = SalesRollup.objects.filter(
+            seller=request.user.seller,
+            day__gte=date_from,
+            day__lte=date_to
+        ).order_by()
+        metrics = {name: Sum(name) for name in ROLLUP_METRICS}
+        days = list(rollups.values('day').annotate(**metrics).order_by('day'))
+        products = rollups.values('product__slug', 'product__name').annotate(
+            **metrics
+        ).order_by('-revenue', 'product__slug')
+        totals = {name: sum(day[name] for day in days)
+                  for name in ROLLUP_METRICS}
+
+        serializer = self.serializer_class({'date_from': date_from,
+                                            'date_to': date_to,
+                                            'totals': totals,
+                                            'days': days,
+                                            'products': products})
+        return Response(serializer.data, status=200)
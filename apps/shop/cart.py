@@ -0,0 +1,191 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (Case, F, IntegerField, OuterRef, Subquery,
+                              Sum, Value, When)
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.profiles.models import LINE_TOTAL, Order, OrderItem
+from apps.sellers.rollups import record_checkout
+from apps.shop.facets import invalidate_facets
+from apps.shop.models import Products
+
+# Сброс сводки (invalidate_cart_summary) без общего CACHES доходит
+# только до кеша своего процесса, поэтому сводка хранится недолго
+CART_SUMMARY_CACHE_TIMEOUT = 30
+CART_SUMMARY_CACHE_KEY = 'cart_summary:{user_id}'
+
+
+def get_cart_items(user):
+    """
+    Товары в корзине пользователя с суммой каждой позиции (line_total)
+    """
+    return OrderItem.objects.filter(
+        user=user, order=None
+    ).annotate(line_total=LINE_TOTAL)
+
+
+@transaction.atomic
+def update_cart(user, quantities: dict):
+    """
+    Применяет к корзине несколько изменений сразу.
+    quantities: {id товара: новое количество}, 0 - удалить товар.
+    Строка пользователя блокируется, чтобы параллельные изменения
+    одной корзины не создали дубли позиций
+    """
+    User.objects.select_for_update().filter(pk=user.pk).exists()
+    items = {
+        item.product_id: item
+        for item in OrderItem.objects.filter(user=user, order=None,
+                                             product_id__in=quantities)
+    }
+    now = timezone.now()
+    to_create, to_update, to_delete = [], [], []
+    for product_id, quantity in quantities.items():
+        item = items.get(product_id)
+        if item is None:
+            if quantity:
+                to_create.append(OrderItem(user=user, product_id=product_id,
+                                           quantity=quantity))
+        elif not quantity:
+            to_delete.append(item.id)
+        elif item.quantity != quantity:
+            item.quantity = quantity
+            item.updated_at = now
+            to_update.append(item)
+    if to_create:
+        OrderItem.objects.bulk_create(to_create)
+    if to_update:
+        OrderItem.objects.bulk_update(to_update, ['quantity', 'updated_at'])
+    if to_delete:
+        OrderItem.objects.filter(id__in=to_delete).delete()
+
+
+class EmptyCart(Exception):
+    pass
+
+
+class OutOfStock(Exception):
+    """
+    Товаров на складе меньше, чем в корзине.
+    items: [{'slug', 'requested', 'available'}]
+    """
+    def __init__(self, items):
+        super().__init__(items)
+        self.items = items
+
+
+def get_shortages(quantities: dict) -> list:
+    """
+    Товары, которых на складе меньше, чем нужно. Удаленного товара
+    в наличии 0 штук
+    """
+    products = Products._base_manager.filter(id__in=quantities)
+    shortages = []
+    for product in products.only('slug', 'in_stock', 'is_deleted'):
+        available = 0 if product.is_deleted else max(product.in_stock, 0)
+        if available < quantities[product.id]:
+            shortages.append({'slug': product.slug,
+                              'requested': quantities[product.id],
+                              'available': available})
+    return sorted(shortages, key=lambda item: item['slug'])
+
+
+def place_order(user, **shipping_details) -> Order:
+    """
+    Оформляет заказ из корзины пользователя в одной транзакции.
+    Остатки всех товаров уменьшаются одним условным UPDATE: если хотя бы
+    одного товара не хватает, транзакция откатывается и выбрасывается
+    OutOfStock. Цена и сумма каждой позиции фиксируются в OrderItem,
+    суммы и количество товаров - в Order. Заказ сразу добавляется
+    в продажи продавцов (SalesRollup), кеш фасетов сбрасывается
+    """
+    with transaction.atomic():
+        # Блокировка как в update_cart: корзину нельзя изменить
+        # или оформить повторно, пока идет оформление
+        User.objects.select_for_update().filter(pk=user.pk).exists()
+        orderitems = OrderItem.objects.filter(user=user, order=None,
+                                              quantity__gt=0)
+        quantities = {}
+        for product_id, quantity in orderitems.values_list('product_id',
+                                                           'quantity'):
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        if not quantities:
+            raise EmptyCart
+
+        requested = Case(
+            *(When(id=product_id, then=Value(quantity))
+              for product_id, quantity in quantities.items()),
+            output_field=IntegerField()
+        )
+        updated = Products.objects.filter(
+            id__in=quantities, in_stock__gte=requested
+        ).update(in_stock=F('in_stock') - requested)
+        if updated == len(quantities):
+            # UPDATE не отправляет post_save, поэтому фасеты
+            # (фильтр ?in_stock=) сбрасываются явно
+            transaction.on_commit(invalidate_facets)
+            # Строки товаров заблокированы UPDATE выше, поэтому цены не
+            # изменятся до конца транзакции и суммы заказа совпадут
+            # с зафиксированными суммами позиций
+            totals = orderitems.aggregate(subtotal=Sum(LINE_TOTAL),
+                                          item_count=Sum('quantity'))
+            order = Order.objects.create(user=user,
+                                         subtotal=totals['subtotal'],
+                                         total=totals['subtotal'],
+                                         item_count=totals['item_count'],
+                                         **shipping_details)
+            price = Products._base_manager.filter(
+                pk=OuterRef('product_id')
+            ).values('price_current')[:1]
+            orderitems.update(order=order,
+                              unit_price=Subquery(price),
+                              total_price=Subquery(price) * F('quantity'),
+                              updated_at=timezone.now())
+            record_checkout(order)
+            return order
+        transaction.set_rollback(True)
+    # Остатки читаются уже после отката, без блокировок
+    raise OutOfStock(get_shortages(quantities))
+
+
+def compute_cart_summary(items) -> dict:
+    """
+    Количество товаров и сумма корзины одним агрегирующим запросом.
+    items - результат get_cart_items
+    """
+    summary = items.order_by().aggregate(item_count=Sum('quantity'),
+                                         subtotal=Sum('line_total'))
+    return {
+        'item_count': summary['item_count'] or 0,
+        'subtotal': summary['subtotal'] or Decimal('0.00'),
+    }
+
+
+def get_cache_key(user_id) -> str:
+    return CART_SUMMARY_CACHE_KEY.format(user_id=user_id)
+
+
+def get_cart_summary(user) -> dict:
+    """
+    Сводка корзины из кеша. Если в кеше ее нет, она считается заново
+    """
+    key = get_cache_key(user.id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_cart_summary(get_cart_items(user))
+        cache.set(key, summary, CART_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def set_cart_summary(user, summary):
+    cache.set(get_cache_key(user.id), summary, CART_SUMMARY_CACHE_TIMEOUT)
+
+
+def invalidate_cart_summary(user):
+    """
+    Сбрасывает сводку корзины. Вызывается после любого изменения корзины
+    """
+    cache.delete(get_cache_key(user.id))
@@ -0,0 +1,123 @@
+import hashlib
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+# Ценовые диапазоны фасета "цена". None - без верхней границы
+PRICE_BUCKETS = (
+    (0, 1000),
+    (1000, 5000),
+    (5000, 20000),
+    (20000, 50000),
+    (50000, None),
+)
+
+FACETS_CACHE_TIMEOUT = 60 * 5
+FACETS_VERSION_KEY = 'product_facets_version'
+
+
+def price_bucket_label(low, high) -> str:
+    if high is None:
+        return f'{low}+'
+    return f'{low}-{high}'
+
+
+def price_bucket_expression():
+    """
+    SQL-выражение CASE, определяющее ценовой диапазон продукта
+    """
+    whens = []
+    for low, high in PRICE_BUCKETS:
+        condition = Q(price_current__gte=low)
+        if high is not None:
+            condition &= Q(price_current__lt=high)
+        whens.append(When(condition,
+                          then=Value(price_bucket_label(low, high))))
+    return Case(*whens, default=Value(None), output_field=CharField())
+
+
+def get_facets_version():
+    return cache.get_or_set(FACETS_VERSION_KEY, time.time_ns, None)
+
+
+def invalidate_facets():
+    """
+    Сброс всех закешированных фасетов сменой версии ключа
+    """
+    cache.set(FACETS_VERSION_KEY, time.time_ns(), None)
+
+
+def get_cache_key(filterset) -> str:
+    """
+    Ключ кеша по нормализованному набору фильтров.
+    Используются очищенные значения формы, поэтому ?min_price=10
+    и ?min_price=10.0 попадают в один ключ
+    """
+    params = sorted(
+        (name, str(value.normalize() if isinstance(value, Decimal)
+                   else value))
+        for name, value in filterset.form.cleaned_data.items()
+        if value not in (None, '')
+    )
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'product_facets:{get_facets_version()}:{digest}'
+
+
+def compute_facets(queryset) -> dict:
+    """
+    Подсчет количества товаров по категориям, продавцам и ценовым
+    диапазонам одним GROUP BY запросом
+    """
+    rows = queryset.order_by().values(
+        'category__slug',
+        'category__name',
+        'seller__slug',
+        'seller__business_name',
+        price_bucket=price_bucket_expression()
+    ).annotate(count=Count('id'))
+
+    categories, sellers = {}, {}
+    prices = {price_bucket_label(low, high): 0
+              for low, high in PRICE_BUCKETS}
+    for row in rows:
+        category = categories.setdefault(
+            row['category__slug'],
+            {'slug': row['category__slug'],
+             'name': row['category__name'],
+             'count': 0}
+        )
+        category['count'] += row['count']
+        if row['seller__slug'] is not None:
+            seller = sellers.setdefault(
+                row['seller__slug'],
+                {'slug': row['seller__slug'],
+                 'name': row['seller__business_name'],
+                 'count': 0}
+            )
+            seller['count'] += row['count']
+        if row['price_bucket'] is not None:
+            prices[row['price_bucket']] += row['count']
+
+    def by_count(items):
+        return sorted(items, key=lambda item: (-item['count'], item['name']))
+
+    return {
+        'categories': by_count(categories.values()),
+        'sellers': by_count(sellers.values()),
+        'prices': [{'range': label, 'count': count}
+                   for label, count in prices.items()],
+    }
+
+
+def get_product_facets(filterset) -> dict:
+    """
+    Фасеты для отфильтрованных товаров с кешированием
+    """
+    key = get_cache_key(filterset)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filterset.qs)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
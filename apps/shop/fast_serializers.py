@@ -0,0 +1,158 @@
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from apps.common.images import variant_urls_for_name
+from apps.shop.models import Category, Products
+from apps.shop.serializers import ProductSerializer
+
+PRICE_FIELD = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def _image_url(storage, name, request):
+    """
+    Ссылка на картинку так же, как ее строит serializers.ImageField
+    """
+    if not name:
+        return None
+    url = storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _price(value):
+    return None if value is None else PRICE_FIELD.to_representation(value)
+
+
+def _column_writer(column, convert):
+    def write(row, context):
+        return convert(row[column])
+    return write
+
+
+def _image_writer(column, storage):
+    def write(row, context):
+        return _image_url(storage, row[column], context['request'])
+    return write
+
+
+def _seller_writer(row, context):
+    if row['seller_id'] is None:
+        return None
+    return {
+        'name': _text(row['seller__business_name']),
+        'slug': _text(row['seller__slug']),
+        'avatar': row['seller__user__avatar'] or '',
+    }
+
+
+def _category_writer(storage):
+    def write(row, context):
+        # Категория повторяется у многих товаров страницы, поэтому ее
+        # представление (со ссылками на картинки) строится один раз
+        key = (row['category__name'], row['category__slug'],
+               row['category__image'])
+        categories = context['categories']
+        if key not in categories:
+            name, slug, image = key
+            categories[key] = {
+                'name': _text(name),
+                'slug': _text(slug),
+                'image': _image_url(storage, image, context['request']),
+                'image_variants': variant_urls_for_name(image,
+                                                        context['request']),
+            }
+        return categories[key]
+    return write
+
+
+def _image_variants_writer(row, context):
+    return {name: variant_urls_for_name(row[name], context['request'])
+            for name in ('image1', 'image2', 'image3')}
+
+
+def _rating_writer(row, context):
+    if row['rating_count']:
+        return round(row['rating_avg'], 1)
+    return None
+
+
+def _build_writers():
+    """
+    Функции, которые формируют значение каждого поля ProductSerializer
+    из строки values(), и колонки, которые им нужны
+    """
+    product_storage = Products._meta.get_field('image1').storage
+    category_storage = Category._meta.get_field('image').storage
+    return {
+        'seller': (('seller_id', 'seller__business_name', 'seller__slug',
+                    'seller__user__avatar'), _seller_writer),
+        'name': (('name',), _column_writer('name', _text)),
+        'slug': (('slug',), _column_writer('slug', _text)),
+        'desc': (('desc',), _column_writer('desc', _text)),
+        'price_old': (('price_old',), _column_writer('price_old', _price)),
+        'price_current': (('price_current',),
+                          _column_writer('price_current', _price)),
+        'category': (('category__name', 'category__slug', 'category__image'),
+                     _category_writer(category_storage)),
+        'image1': (('image1',), _image_writer('image1', product_storage)),
+        'image2': (('image2',), _image_writer('image2', product_storage)),
+        'image3': (('image3',), _image_writer('image3', product_storage)),
+        'image_variants': (('image1', 'image2', 'image3'),
+                           _image_variants_writer),
+        'rating': (('rating_count', 'rating_avg'), _rating_writer),
+    }
+
+
+@lru_cache(maxsize=None)
+def compile_product_writers(field_names: tuple):
+    """
+    Сборка колонок и функций для набора полей. Результат кешируется,
+    поэтому для каждого набора fields/exclude сборка выполняется один раз
+    """
+    writers = _build_writers()
+    columns = []
+    compiled = []
+    for name in field_names:
+        field_columns, writer = writers[name]
+        columns.extend(column for column in field_columns
+                       if column not in columns)
+        compiled.append((name, writer))
+    return tuple(columns), tuple(compiled)
+
+
+class FastProductSerializer:
+    """
+    Быстрое представление списка товаров на основе values().
+    Результат совпадает с ProductSerializer(many=True) байт в байт,
+    но без создания полей DRF и экземпляров моделей на каждый товар.
+    Поддерживает те же параметры fields/exclude
+    """
+
+    def __init__(self, fields=None, exclude=None, request=None):
+        # Проверка и порядок полей - как у ProductSerializer
+        field_names = tuple(
+            ProductSerializer(fields=fields, exclude=exclude).fields
+        )
+        self.columns, self.writers = compile_product_writers(field_names)
+        self.request = request
+
+    def prepare_queryset(self, queryset, extra_fields=()):
+        """
+        Запрос только нужных колонок в виде словарей
+        """
+        columns = list(self.columns)
+        columns.extend(field for field in extra_fields
+                       if field not in columns)
+        return queryset.values(*columns)
+
+    def to_representation(self, rows) -> list:
+        context = {'request': self.request, 'categories': {}}
+        writers = self.writers
+        return [{name: write(row, context) for name, write in writers}
+                for row in rows]
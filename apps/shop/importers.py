@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from apps.shop.facets import invalidate_facets
+from apps.shop.models import Category, Products
+from apps.shop.search import index_products
+from apps.shop.serializers import ImportProductSerializer
+
+# Количество товаров в одной транзакции bulk_create
+IMPORT_BATCH_SIZE = 500
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    """
+    Определение формата файла по расширению
+    """
+    if filename.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if filename.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_rows(stream, import_format: str):
+    """
+    Построчное чтение файла без загрузки его целиком в память.
+    Возвращает пары (номер строки, данные) или (номер строки, ошибка)
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_num, 'Некорректный JSON'
+            continue
+        if not isinstance(row, dict):
+            yield line_num, 'Строка должна быть JSON-объектом'
+            continue
+        yield line_num, row
+
+
+class ProductImporter:
+    """
+    Массовый импорт товаров продавца из CSV или NDJSON.
+    Категории загружаются один раз, уникальные slug подбираются пачкой
+    на весь batch, товары создаются через bulk_create в отдельной
+    транзакции на каждый batch. Ошибки в строках не прерывают импорт
+    """
+
+    def __init__(self, seller, batch_size: int = IMPORT_BATCH_SIZE):
+        self.seller = seller
+        self.batch_size = batch_size
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.slug_field = Products._meta.get_field('slug')
+        # Один экземпляр сериализатора на весь импорт: создание
+        # сериализатора копирует все поля и дорого обходится на
+        # десятках тысяч строк
+        self.serializer = ImportProductSerializer()
+        # Необязательные колонки. csv.DictReader возвращает пустую
+        # строку для пустой ячейки, такая ячейка считается отсутствующей,
+        # чтобы сработало значение по умолчанию
+        self.optional_fields = {name for name, field
+                                in self.serializer.fields.items()
+                                if not field.required}
+        self.created = 0
+        self.total = 0
+        self.errors = []
+
+    def run(self, stream, import_format: str) -> dict:
+        batch = []
+        for line_num, row in read_rows(stream, import_format):
+            self.total += 1
+            product = self.build_product(line_num, row)
+            if product is None:
+                continue
+            batch.append((line_num, product))
+            if len(batch) >= self.batch_size:
+                self.save_batch(batch)
+                batch = []
+        if batch:
+            self.save_batch(batch)
+        if self.created:
+            invalidate_facets()
+        return {'total': self.total,
+                'created': self.created,
+                'errors': self.errors}
+
+    def build_product(self, line_num, row):
+        """
+        Валидация строки и создание несохраненного продукта
+        """
+        if isinstance(row, str):
+            self.errors.append({'row': line_num, 'errors': row})
+            return None
+
+        row = {key: value for key, value in row.items()
+               if key not in self.optional_fields
+               or value not in ('', None)}
+        try:
+            data = self.serializer.run_validation(row)
+        except ValidationError as error:
+            self.errors.append({'row': line_num, 'errors': error.detail})
+            return None
+
+        category_id = self.categories.get(data.pop('category_slug'))
+        if category_id is None:
+            self.errors.append({'row': line_num,
+                                'errors': 'Категория не найдена'})
+            return None
+        return Products(seller=self.seller, category_id=category_id, **data)
+
+    def allocate_slugs(self, products) -> None:
+        """
+        Подбор уникальных slug для всех товаров batch двумя запросами.
+        Нумерация совпадает с AutoSlugField: slug, slug-2, slug-3...
+        """
+        field = self.slug_field
+        sep = field.index_sep
+        bases = [field.slugify(product.name)[:field.max_length]
+                 or Products._meta.model_name for product in products]
+
+        # Базовые slug, которые уже заняты
+        taken = set(Products._base_manager.filter(
+            slug__in=set(bases)
+        ).values_list('slug', flat=True))
+
+        # Наибольший занятый номер для базовых slug, которые заняты
+        # или повторяются внутри batch. Сравнение строк по диапазону
+        # использует индекс slug
+        counts = Counter(bases)
+        numbered = taken | {base for base, count in counts.items()
+                            if count > 1}
+        next_index = {base: 2 for base in counts}
+        conflicts = Q()
+        for base in numbered:
+            conflicts |= Q(slug__gt=f'{base}{sep}', slug__lt=f'{base}.')
+        if numbered:
+            existing = Products._base_manager.filter(
+                conflicts
+            ).values_list('slug', flat=True)
+            for slug in existing:
+                base, _, index = slug.rpartition(sep)
+                if base in next_index and index.isdigit():
+                    next_index[base] = max(next_index[base], int(index) + 1)
+
+        used = set()
+        for product, base in zip(products, bases):
+            slug = base
+            if slug in taken or slug in used:
+                while True:
+                    suffix = f'{sep}{next_index[base]}'
+                    next_index[base] += 1
+                    slug = base[:field.max_length - len(suffix)] + suffix
+                    if slug not in used:
+                        break
+            used.add(slug)
+            product.slug = slug
+            product._slug_allocated = True
+
+    def save_batch(self, batch) -> None:
+        products = [product for _, product in batch]
+        self.allocate_slugs(products)
+        try:
+            with transaction.atomic():
+                Products.objects.bulk_create(products)
+                index_products([product.pk for product in products])
+            self.created += len(products)
+        except IntegrityError:
+            # Slug заняли параллельно - сохраняем товары по одному,
+            # чтобы ошибка одной строки не отменяла весь batch
+            for line_num, product in batch:
+                self.save_single(line_num, product)
+
+    def save_single(self, line_num, product) -> None:
+        product._slug_allocated = False
+        product.slug = None
+        try:
+            with transaction.atomic():
+                product.save(force_insert=True)
+            self.created += 1
+        except IntegrityError as error:
+            self.errors.append({'row': line_num, 'errors': str(error)})
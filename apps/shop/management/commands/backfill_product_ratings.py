@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (Count, F, FloatField, IntegerField,
+                              OuterRef, Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from apps.reviews.models import Review
+from apps.shop.models import RATING_HISTOGRAM_FIELDS, Products
+
+
+class Command(BaseCommand):
+    """
+    Пересчет полей rating_sum, rating_count, rating_avg и гистограммы
+    оценок (rating_1 ... rating_5) у всех продуктов по неудаленным
+    отзывам
+    """
+    help = 'Пересчет рейтинга всех продуктов по отзывам'
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(
+            product=OuterRef('pk')
+        ).order_by().values('product')
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total'),
+                     output_field=IntegerField()),
+            Value(0)
+        )
+        rating_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total'),
+                     output_field=IntegerField()),
+            Value(0)
+        )
+
+        histogram = {
+            field: Coalesce(
+                Subquery(reviews.filter(rating=value).annotate(
+                    total=Count('id')
+                ).values('total'), output_field=IntegerField()),
+                Value(0)
+            )
+            for value, field in RATING_HISTOGRAM_FIELDS.items()
+        }
+
+        with transaction.atomic():
+            updated = Products.objects.update(rating_sum=rating_sum,
+                                              rating_count=rating_count,
+                                              **histogram)
+            Products.objects.update(
+                rating_avg=(Cast(F('rating_sum'), FloatField())
+                            / NullIf(F('rating_count'), 0))
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан у {updated} продуктов')
+        )
@@ -0,0 +1,115 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounts.models import User
+from apps.sellers.models import Seller
+from apps.shop.fast_serializers import FastProductSerializer
+from apps.shop.models import Category, Products
+from apps.shop.serializers import ProductSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Замер скорости ProductSerializer и FastProductSerializer. Тестовые
+    товары создаются в транзакции, которая затем откатывается.
+    Совпадение JSON обоих сериализаторов проверяется в тестах
+    (apps.shop.tests.FastProductSerializerTests)
+    """
+    help = 'Сравнение ProductSerializer и FastProductSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000,
+                            help='Количество тестовых товаров')
+        parser.add_argument('--page-size', type=int, default=100,
+                            help='Размер страницы')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_fixtures(options['products'])
+                self.benchmark(options['page_size'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixtures(self, count):
+        user = User.objects.create_user('Bench', 'Mark',
+                                        'benchmark@example.com', None)
+        seller = Seller.objects.create(user=user,
+                                       business_name='Benchmark',
+                                       inn_identification_number='0',
+                                       phone_number='0',
+                                       business_description='-',
+                                       business_address='-',
+                                       city='-',
+                                       postal_code='0',
+                                       bank_name='-',
+                                       bank_bic_number='0',
+                                       bank_account_number='0',
+                                       bank_routing_number='0')
+        category = Category.objects.create(name='Benchmark category',
+                                           image='category_images/x.jpg')
+        products = []
+        for index in range(count):
+            product = Products(
+                seller=seller if index % 5 else None,
+                category=category,
+                name=f'Benchmark product {index}',
+                slug=f'benchmark-product-{index}',
+                desc='Описание товара ' * 20,
+                price_current=Decimal(index) + Decimal('0.99'),
+                price_old=Decimal(index * 2) if index % 3 else None,
+                image1='products_image/x.jpg',
+                image2='products_image/y.jpg' if index % 2 else '',
+                rating_sum=index % 11,
+                rating_count=index % 3,
+                rating_avg=(index % 11) / (index % 3) if index % 3 else None,
+            )
+            product._slug_allocated = True
+            products.append(product)
+        Products.objects.bulk_create(products, batch_size=500)
+
+    def get_page(self, page_size):
+        return Products.objects.select_related(
+            'category', 'seller', 'seller__user'
+        ).order_by('-created_at', '-id')[:page_size]
+
+    def render_drf(self, page_size, sparse_fields):
+        serializer = ProductSerializer(**sparse_fields)
+        queryset = serializer.optimize_queryset(self.get_page(page_size))
+        data = ProductSerializer(queryset, many=True, **sparse_fields).data
+        return JSONRenderer().render(data)
+
+    def render_fast(self, page_size, sparse_fields):
+        serializer = FastProductSerializer(**sparse_fields)
+        rows = serializer.prepare_queryset(self.get_page(page_size))
+        return JSONRenderer().render(serializer.to_representation(rows))
+
+    def measure(self, render, page_size, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render(page_size, {})
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2] * 1000
+
+    def benchmark(self, page_size, repeat):
+        drf = self.measure(self.render_drf, page_size, repeat)
+        fast = self.measure(self.render_fast, page_size, repeat)
+        self.stdout.write(
+            f'Страница из {page_size} товаров (медиана {repeat} замеров):\n'
+            f'  ProductSerializer:     {drf:.2f} мс\n'
+            f'  FastProductSerializer: {fast:.2f} мс\n'
+            f'  Ускорение:             {drf / fast:.1f}x'
+        )
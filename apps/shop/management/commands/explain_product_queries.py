@@ -0,0 +1,203 @@
+import re
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import User
+from apps.sellers.models import Seller
+from apps.sellers import views as sellers_views
+from apps.shop import views as shop_views
+from apps.shop.models import Category, Products
+
+PRODUCTS_TABLE = Products._meta.db_table
+
+# Строка плана SQLite, читающая таблицу целиком: SCAN по любой таблице
+# или псевдониму (U0, T6) без индекса, или SCAN ... USING INDEX - весь
+# индекс без условия. SEARCH, SCAN CONSTANT ROW и SCAN виртуальной
+# таблицы FTS5 по MATCH (VIRTUAL TABLE INDEX) полным чтением не считаются
+SQLITE_SCAN_PATTERN = re.compile(
+    r'^SCAN (?!CONSTANT ROW$)\S+(?: AS \S+)?'
+    r'(?P<index> USING (?:COVERING )?INDEX \S+)?(?: LEFT-JOIN)?$'
+)
+POSTGRESQL_SEQ_SCAN_PATTERN = re.compile(r'\bSeq Scan on ')
+POSTGRESQL_INDEX_SCAN_PATTERN = re.compile(
+    r'^(?P<indent>\s*(?:->\s*)?)Index (?:Only )?Scan(?: Backward)? using '
+)
+
+# Представления, которые отдают все живые товары без фильтров: для них
+# чтение всего частичного индекса (COUNT(*), ORDER BY ... LIMIT)
+# ожидаемо. Полное чтение самой таблицы не допускается нигде
+UNFILTERED_ENDPOINTS = {'shop.ProductsView', 'shop.ProductsView (cursor)'}
+
+
+def get_postgresql_index_scan_end(plan, start, indent) -> int:
+    """
+    Номер первой строки плана после узла Index Scan со строки start
+    """
+    for end in range(start + 1, len(plan)):
+        line = plan[end]
+        if len(line) - len(line.lstrip()) <= len(indent):
+            return end
+    return len(plan)
+
+
+def find_full_scans(vendor, plan, allow_index_scan=False) -> list:
+    """
+    Строки плана, которые читают таблицу целиком, или весь индекс без
+    условия, если allow_index_scan=False
+    """
+    found = []
+    for number, line in enumerate(plan):
+        if vendor == 'sqlite':
+            match = SQLITE_SCAN_PATTERN.match(line)
+            if match and not (match['index'] and allow_index_scan):
+                found.append(line)
+        elif POSTGRESQL_SEQ_SCAN_PATTERN.search(line):
+            found.append(line)
+        elif not allow_index_scan:
+            match = POSTGRESQL_INDEX_SCAN_PATTERN.match(line)
+            if match is None:
+                continue
+            end = get_postgresql_index_scan_end(plan, number,
+                                                match['indent'])
+            if not any('Index Cond:' in detail
+                       for detail in plan[number + 1:end]):
+                found.append(line)
+    return found
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Проверка планов запросов к таблице продуктов.
+    Каждое представление с товарами из apps/shop/views.py и
+    apps/sellers/views.py вызывается внутри транзакции, которая затем
+    откатывается. Для всех SELECT-запросов к shop_products выполняется
+    EXPLAIN. Если хоть один запрос читает целиком таблицу (любую,
+    не только shop_products) или индекс без условия - команда
+    завершается ошибкой
+    """
+    help = 'EXPLAIN-проверка использования индексов запросами к товарам'
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Бэкенд {vendor} не поддерживается')
+
+        self.failures = []
+        try:
+            with transaction.atomic():
+                if vendor == 'postgresql':
+                    # На маленьких таблицах PostgreSQL выбирает Seq Scan
+                    # даже при наличии подходящего индекса
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                self.check_endpoints(vendor)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if self.failures:
+            raise CommandError(
+                'Полное сканирование таблицы: ' + ', '.join(self.failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Все запросы используют индексы'))
+
+    def create_fixtures(self):
+        """
+        Временные данные для вызова представлений
+        """
+        user = User.objects.create_user('Explain', 'Check',
+                                        'explain-check@example.com', None,
+                                        account_type='SELLER')
+        seller = Seller.objects.create(user=user,
+                                       business_name='Explain check',
+                                       inn_identification_number='0',
+                                       phone_number='0',
+                                       business_description='-',
+                                       business_address='-',
+                                       city='-',
+                                       postal_code='0',
+                                       bank_name='-',
+                                       bank_bic_number='0',
+                                       bank_account_number='0',
+                                       bank_routing_number='0',
+                                       is_approved=True)
+        category = Category.objects.create(name='Explain check category',
+                                           image='category_images/x.jpg')
+        product = Products.objects.create(seller=seller,
+                                          category=category,
+                                          name='Explain check product',
+                                          desc='-',
+                                          price_current=Decimal('10.00'),
+                                          image1='products_image/x.jpg')
+        return user, seller, category, product
+
+    def get_endpoints(self, seller, category, product):
+        return [
+            ('shop.ProductsView', shop_views.ProductsView,
+             '/shop/products/', {}),
+            ('shop.ProductsView (filters)', shop_views.ProductsView,
+             '/shop/products/?min_price=5&max_price=100', {}),
+            ('shop.ProductsView (cursor)', shop_views.ProductsView,
+             '/shop/products/?pagination=cursor', {}),
+            ('shop.ProductsByCategoryView',
+             shop_views.ProductsByCategoryView,
+             f'/shop/categories/{category.slug}/', {'slug': category.slug}),
+            ('shop.ProductsBySellerView', shop_views.ProductsBySellerView,
+             f'/shop/sellers/{seller.slug}', {'slug': seller.slug}),
+            ('shop.ProductView', shop_views.ProductView,
+             f'/shop/products/{product.slug}', {'slug': product.slug}),
+            ('shop.ProductSearchView', shop_views.ProductSearchView,
+             '/shop/products/search?q=explain', {}),
+            ('shop.ProductFacetsView', shop_views.ProductFacetsView,
+             '/shop/products/facets?min_price=5', {}),
+            ('shop.CartView', shop_views.CartView, '/shop/cart/', {}),
+            ('sellers.ProductsBySellerView',
+             sellers_views.ProductsBySellerView,
+             '/sellers/products/', {}),
+        ]
+
+    def check_endpoints(self, vendor):
+        user, seller, category, product = self.create_fixtures()
+        factory = APIRequestFactory()
+
+        for name, view_class, url, kwargs in self.get_endpoints(
+                seller, category, product):
+            request = factory.get(url)
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as context:
+                view_class.as_view()(request, **kwargs)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for query in context.captured_queries:
+                sql = query['sql']
+                if (not sql.startswith('SELECT')
+                        or PRODUCTS_TABLE not in sql):
+                    continue
+                plan = self.explain(vendor, sql)
+                full_scans = find_full_scans(
+                    vendor, plan,
+                    allow_index_scan=name in UNFILTERED_ENDPOINTS
+                )
+                self.stdout.write(f'  {sql[:100]}...')
+                for line in plan:
+                    style = (self.style.ERROR if line in full_scans
+                             else self.style.SUCCESS)
+                    self.stdout.write(style(f'    {line}'))
+                if full_scans:
+                    self.failures.append(name)
+
+    def explain(self, vendor, sql):
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[3] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
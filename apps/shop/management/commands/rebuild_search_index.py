@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.shop.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Полная перестройка поискового индекса продуктов (FTS5)
+    """
+    help = 'Перестройка поискового индекса продуктов'
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(
+                self.style.WARNING('Полнотекстовый индекс доступен '
+                                   'только на SQLite')
+            )
+            return
+
+        with transaction.atomic():
+            indexed = rebuild_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано продуктов: {indexed}')
+        )
@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from apps.reviews.models import Review
+from apps.shop.models import RATING_HISTOGRAM_FIELDS, Products
+
+
+class Command(BaseCommand):
+    """
+    Проверка гистограмм оценок продуктов. Гистограммы всех продуктов
+    пересчитываются одним GROUP BY-запросом по неудаленным отзывам
+    и сравниваются с сохраненными. С --fix расхождения исправляются
+    """
+    help = 'Проверка гистограмм оценок продуктов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Исправить расхождения')
+
+    def handle(self, *args, **options):
+        expected = defaultdict(dict)
+        for row in Review.objects.order_by().values(
+            'product_id', 'rating'
+        ).annotate(total=Count('id')):
+            expected[row['product_id']][row['rating']] = row['total']
+
+        fields = list(RATING_HISTOGRAM_FIELDS.values())
+        drifted = []
+        for product in Products._base_manager.only('slug', *fields):
+            counts = expected.get(product.pk, {})
+            diff = {
+                value: (getattr(product, field), counts.get(value, 0))
+                for value, field in RATING_HISTOGRAM_FIELDS.items()
+                if getattr(product, field) != counts.get(value, 0)
+            }
+            if diff:
+                drifted.append(product)
+                self.stdout.write(f'{product.slug}: ' + ', '.join(
+                    f'{value}: {stored} вместо {actual}'
+                    for value, (stored, actual) in diff.items()
+                ))
+                for value, field in RATING_HISTOGRAM_FIELDS.items():
+                    setattr(product, field, counts.get(value, 0))
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        if not options['fix']:
+            raise CommandError(
+                f'Расхождения у {len(drifted)} продуктов. '
+                'Запустите с --fix, чтобы исправить'
+            )
+        with transaction.atomic():
+            Products._base_manager.bulk_update(drifted, fields,
+                                               batch_size=500)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено продуктов: {len(drifted)}'
+        ))
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_alter_products_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='products',
+            name='rating_avg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
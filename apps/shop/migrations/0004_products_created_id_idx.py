@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0001_initial'),
+        ('shop', '0003_products_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['-created_at', '-id'], name='products_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    """
+    Создание таблицы FTS5 и заполнение ее неудаленными продуктами.
+    Название весит больше описания, категория и продавец - посередине
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE shop_products_fts USING fts5("
+        "name, description, category, seller, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO shop_products_fts(shop_products_fts, rank) "
+        "VALUES('rank', 'bm25(10.0, 1.0, 4.0, 4.0)')"
+    )
+    schema_editor.execute(
+        "INSERT INTO shop_productsearchdocument(product_id) "
+        "SELECT id FROM shop_products WHERE is_deleted = 0"
+    )
+    schema_editor.execute(
+        "INSERT INTO shop_products_fts"
+        "(rowid, name, description, category, seller) "
+        "SELECT d.id, p.name, p.\"desc\", c.name, "
+        "COALESCE(s.business_name, '') "
+        "FROM shop_productsearchdocument d "
+        "JOIN shop_products p ON p.id = d.product_id "
+        "JOIN shop_category c ON c.id = p.category_id "
+        "LEFT JOIN sellers_seller s ON s.id = p.seller_id"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS shop_products_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_products_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='shop.products')),
+            ],
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
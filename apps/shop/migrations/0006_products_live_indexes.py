@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0001_initial'),
+        ('shop', '0005_products_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='products',
+            name='products_created_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at', '-id'], name='products_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-id'], name='products_live_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['category', '-id'], name='products_live_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['seller', '-id'], name='products_live_seller_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['price_current'], name='products_live_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['in_stock'], name='products_live_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:02
+
+import apps.common.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_products_live_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='products',
+            name='slug',
+            field=apps.common.fields.BulkAutoSlugField(editable=False, populate_from='name', unique=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:21
+
+import apps.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_products_bulk_slug'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='products',
+            name='id',
+            field=models.UUIDField(db_index=True, default=apps.common.models.generate_id, editable=False, primary_key=True, serialize=False, unique=True),
+        ),
+    ]
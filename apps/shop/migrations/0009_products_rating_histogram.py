@@ -0,0 +1,60 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:35
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_histograms(apps, schema_editor):
+    """
+    Заполнение гистограммы оценок по неудаленным отзывам
+    """
+    Products = apps.get_model('shop', 'Products')
+    Review = apps.get_model('reviews', 'Review')
+    updates = {}
+    for value in range(1, 6):
+        reviews = Review.objects.filter(
+            product=OuterRef('pk'), rating=value, is_deleted=False
+        ).order_by().values('product').annotate(total=Count('id'))
+        updates[f'rating_{value}'] = Coalesce(
+            Subquery(reviews.values('total'), output_field=IntegerField()),
+            Value(0)
+        )
+    Products._base_manager.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_uuid7_primary_keys'),
+        ('reviews', '0005_reviews_live_product_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='products',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_histograms, migrations.RunPython.noop),
+    ]
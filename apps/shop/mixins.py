@@ -0,0 +1,78 @@
+from rest_framework.response import Response
+
+from apps.common.paginations import (CustomCursorPagination,
+                                     CustomPagination)
+from apps.common.serializers import sparse_fields_from_request
+from apps.shop.cart import (compute_cart_summary, get_cart_items,
+                            set_cart_summary)
+from apps.shop.fast_serializers import FastProductSerializer
+from apps.shop.filters import ProductFilter
+from apps.shop.serializers import CartSerializer
+
+
+class ProductListMixin:
+    """
+    Миксин для представлений со списком товаров.
+    Применяет фильтры ProductFilter и пагинацию. Размер страницы
+    ограничен max_page_size, поэтому весь список за один запрос
+    получить нельзя. Параметры fields/exclude ограничивают поля
+    ответа и колонки, которые загружаются из базы данных.
+    Товары сериализуются через FastProductSerializer из values()
+    """
+    pagination_class = CustomPagination
+    cursor_pagination_class = CustomCursorPagination
+    filterset_class = ProductFilter
+    fast_serializer_class = FastProductSerializer
+
+    def get_paginator(self, request):
+        """
+        Выбор пагинации по параметру pagination.
+        Запрос с параметром cursor всегда использует пагинацию по курсору
+        """
+        if (request.query_params.get('pagination') == 'cursor'
+                or 'cursor' in request.query_params):
+            return self.cursor_pagination_class()
+        return self.pagination_class()
+
+    def get_paginated_products(self, request, queryset):
+        """
+        Фильтрация, пагинация и сериализация товаров
+        """
+        serializer = self.fast_serializer_class(
+            **sparse_fields_from_request(request)
+        )
+        queryset = serializer.prepare_queryset(queryset,
+                                               extra_fields=('created_at',))
+
+        filterset = self.filterset_class(request.GET, queryset=queryset)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        paginator = self.get_paginator(request)
+        paginated_queryset = paginator.paginate_queryset(filterset.qs,
+                                                         request,
+                                                         view=self)
+        data = serializer.to_representation(paginated_queryset)
+        return paginator.get_paginated_response(data)
+
+
+class CartMixin:
+    """
+    Миксин для представлений, которые возвращают корзину пользователя
+    """
+    cart_serializer_class = CartSerializer
+
+    def get_cart_response(self, user):
+        """
+        Товары корзины, их количество и сумма. Сводка заодно
+        обновляется в кеше
+        """
+        orderitems = get_cart_items(user).select_related(
+            'product',
+            'product__seller',
+            'product__seller__user'
+        )
+        summary = compute_cart_summary(orderitems)
+        set_cart_summary(user, summary)
+        serializer = self.cart_serializer_class({'items': orderitems,
+                                                 **summary})
+        return Response(serializer.data, status=200)
@@ -1,9 +1,16 @@
 from autoslug import AutoSlugField
 from django.db import models
 
+from apps.common.fields import BulkAutoSlugField
 from apps.common.models import BaseModel, IsDeletedModel
 from apps.sellers.models import Seller
 
+# Возможные оценки отзыва и поля продукта с количеством отзывов
+# для каждой оценки (гистограмма рейтинга)
+RATING_VALUES = (1, 2, 3, 4, 5)
+RATING_HISTOGRAM_FIELDS = {value: f'rating_{value}'
+                           for value in RATING_VALUES}
+
 
 class Category(BaseModel):
     """
@@ -53,6 +60,11 @@ class Products(IsDeletedModel):
         category(ForeignKey): Категория продукта
         in_stock (int): Количество продуктов на складе
         image1, image2, image3 (ImageField): Картинки продукта
+        rating_sum (int): Сумма оценок неудаленных отзывов
+        rating_count (int): Количество неудаленных отзывов
+        rating_avg (float): Средняя оценка. None, если отзывов нет
+        rating_1 ... rating_5 (int): Количество неудаленных отзывов
+                                     с оценкой 1 ... 5
 
     Методы:
         __str__(): Возвращает информацию о продукте
@@ -63,7 +75,9 @@ class Products(IsDeletedModel):
                                related_name='products',
                                null=True)
     name = models.CharField(max_length=100)
-    slug = AutoSlugField(populate_from='name', unique=True, db_index=True)
+    slug = BulkAutoSlugField(populate_from='name',
+                             unique=True,
+                             db_index=True)
     desc = models.TextField()
     price_old = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     price_current = models.DecimalField(max_digits=10, decimal_places=2)
@@ -77,8 +91,67 @@ class Products(IsDeletedModel):
     image2 = models.ImageField(upload_to='products_image/', blank=True)
     image3 = models.ImageField(upload_to='products_image/', blank=True)
 
+    # Рейтинг продукта. Пересчитывается при изменении отзывов
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta(IsDeletedModel.Meta):
+        # Частичные индексы только по неудаленным продуктам,
+        # так как IsDeletedManager всегда добавляет is_deleted=False
+        indexes = [
+            # Пагинация по курсору (CustomCursorPagination)
+            models.Index(fields=['-created_at', '-id'],
+                         name='products_live_created_idx',
+                         condition=models.Q(is_deleted=False)),
+            # Сортировка по умолчанию (-id)
+            models.Index(fields=['-id'],
+                         name='products_live_id_idx',
+                         condition=models.Q(is_deleted=False)),
+            # Товары категории и продавца
+            models.Index(fields=['category', '-id'],
+                         name='products_live_category_idx',
+                         condition=models.Q(is_deleted=False)),
+            models.Index(fields=['seller', '-id'],
+                         name='products_live_seller_idx',
+                         condition=models.Q(is_deleted=False)),
+            # Фильтры ProductFilter
+            models.Index(fields=['price_current'],
+                         name='products_live_price_idx',
+                         condition=models.Q(is_deleted=False)),
+            models.Index(fields=['in_stock'],
+                         name='products_live_stock_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
+
     def __str__(self):
         """
         Возвращает информацию о продукте
         """
         return str(self.name)
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Связь продукта со строкой полнотекстового индекса (shop_products_fts).
+    Целочисленный id используется как rowid в таблице FTS5, так как
+    у продуктов первичный ключ - UUID
+
+    Поля:
+        product (OneToOneField): Проиндексированный продукт
+    """
+
+    product = models.OneToOneField(Products,
+                                   on_delete=models.CASCADE,
+                                   related_name='search_document')
+
+    def __str__(self):
+        """
+        Возвращает информацию о документе индекса
+        """
+        return f'Индекс продукта {self.product_id}'
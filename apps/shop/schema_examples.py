@@ -1,5 +1,21 @@
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
 
+SPARSE_FIELDS_PARAM_EXAMPLE = [
+    OpenApiParameter(
+        name='fields',
+        description='Поля товара в ответе через запятую '
+                    '(например, name,slug,price_current)',
+        required=False,
+        type=OpenApiTypes.STR
+    ),
+    OpenApiParameter(
+        name='exclude',
+        description='Поля товара, которые не нужны в ответе, через запятую',
+        required=False,
+        type=OpenApiTypes.STR
+    )
+]
+
 PRODUCT_PARAM_EXAMPLE = [
     OpenApiParameter(
         name='max_price',
@@ -36,5 +52,48 @@ PRODUCT_PARAM_EXAMPLE = [
         description='Отображение количества товаров на странице',
         required=False,
         type=OpenApiTypes.INT
-    )
+    ),
+    OpenApiParameter(
+        name='pagination',
+        description='Тип пагинации: page (по умолчанию) или cursor',
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=['page', 'cursor']
+    ),
+    OpenApiParameter(
+        name='cursor',
+        description='Курсор следующей или предыдущей страницы '
+                    '(для pagination=cursor)',
+        required=False,
+        type=OpenApiTypes.STR
+    ),
+    *SPARSE_FIELDS_PARAM_EXAMPLE
+]
+
+# Фасеты принимают те же фильтры, что и список товаров
+FACETS_PARAM_EXAMPLE = [
+    parameter for parameter in PRODUCT_PARAM_EXAMPLE
+    if parameter.name in ('max_price', 'min_price', 'in_stock', 'created_at')
+]
+
+SEARCH_PARAM_EXAMPLE = [
+    OpenApiParameter(
+        name='q',
+        description='Поисковый запрос',
+        required=True,
+        type=OpenApiTypes.STR
+    ),
+    OpenApiParameter(
+        name='page',
+        description='Страница для пагинации',
+        required=False,
+        type=OpenApiTypes.INT
+    ),
+    OpenApiParameter(
+        name='page_size',
+        description='Отображение количества товаров на странице',
+        required=False,
+        type=OpenApiTypes.INT
+    ),
+    *SPARSE_FIELDS_PARAM_EXAMPLE
 ]
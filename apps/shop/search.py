@@ -0,0 +1,143 @@
+import re
+import uuid
+
+from django.db import connection
+
+from apps.shop.models import Products, ProductSearchDocument
+
+FTS_TABLE = 'shop_products_fts'
+
+# Максимальное количество результатов поиска
+MAX_SEARCH_RESULTS = 1000
+
+# Размер пачки продуктов при переиндексации
+INDEX_BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_supported() -> bool:
+    """
+    Полнотекстовый индекс (FTS5) доступен только на SQLite
+    """
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query: str) -> str:
+    """
+    Преобразование поисковой строки в выражение MATCH для FTS5.
+    Каждое слово берется в кавычки, чтобы спецсимволы FTS5 не
+    ломали запрос. К последнему слову добавляется поиск по префиксу
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def index_products(product_ids) -> None:
+    """
+    Добавление, обновление и удаление продуктов в индексе.
+    Неудаленные продукты переиндексируются, удаленные (is_deleted)
+    и несуществующие убираются из индекса
+    """
+    if not is_supported():
+        return
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+        _index_batch(product_ids[start:start + INDEX_BATCH_SIZE])
+
+
+def _index_batch(product_ids) -> None:
+    products = list(Products.objects.filter(pk__in=product_ids).values_list(
+        'pk', 'name', 'desc', 'category__name', 'seller__business_name'
+    ))
+    live_ids = {row[0] for row in products}
+
+    ProductSearchDocument.objects.filter(
+        product_id__in=product_ids
+    ).exclude(product_id__in=live_ids).delete()
+    ProductSearchDocument.objects.bulk_create(
+        [ProductSearchDocument(product_id=pk) for pk in live_ids],
+        ignore_conflicts=True
+    )
+    documents = dict(ProductSearchDocument.objects.filter(
+        product_id__in=live_ids
+    ).values_list('product_id', 'id'))
+    if not documents:
+        return
+
+    with connection.cursor() as cursor:
+        placeholders = ', '.join(['%s'] * len(documents))
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+            list(documents.values())
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, name, description, category, seller) '
+            f'VALUES (%s, %s, %s, %s, %s)',
+            [(documents[pk], name, desc, category, seller or '')
+             for pk, name, desc, category, seller in products]
+        )
+
+
+def remove_documents(document_ids) -> None:
+    """
+    Удаление строк индекса по id документов
+    """
+    if not is_supported():
+        return
+    document_ids = list(document_ids)
+    if not document_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(document_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+            document_ids
+        )
+
+
+def rebuild_index() -> int:
+    """
+    Полная перестройка индекса по всем неудаленным продуктам
+    """
+    if not is_supported():
+        return 0
+    document_table = ProductSearchDocument._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'DELETE FROM {document_table}')
+    product_ids = list(Products.objects.values_list('pk', flat=True))
+    index_products(product_ids)
+    return len(product_ids)
+
+
+def search_product_ids(query: str) -> list:
+    """
+    Поиск продуктов по названию, описанию, категории и продавцу.
+    Возвращает id продуктов, отсортированные по релевантности (bm25)
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    if not is_supported():
+        # Без FTS5 поиск работает только по названию и без ранжирования
+        products = Products.objects.filter(name__icontains=query.strip())
+        return list(products.values_list('pk', flat=True)
+                    [:MAX_SEARCH_RESULTS])
+
+    document_table = ProductSearchDocument._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT d.product_id FROM {FTS_TABLE} '
+            f'JOIN {document_table} d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY rank LIMIT %s',
+            [match, MAX_SEARCH_RESULTS]
+        )
+        return [uuid.UUID(row[0]) for row in cursor.fetchall()]
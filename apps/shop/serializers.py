@@ -1,11 +1,13 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from django.db import models
 
-from apps.common.utils import avg_rating
+from apps.common.images import variant_urls
+from apps.common.serializers import SparseFieldsMixin
 from apps.profiles.serializers import ShippingAddressSerializer
 from apps.sellers.serializers import SellerSerializer
-from apps.shop.models import Products
+from apps.shop.models import RATING_HISTOGRAM_FIELDS, Products
 
 
 class CategorySerializer(serializers.Serializer):
@@ -15,6 +17,11 @@ class CategorySerializer(serializers.Serializer):
     name = serializers.CharField(max_length=100)
     slug = serializers.SlugField(read_only=True)
     image = serializers.ImageField()
+    image_variants = serializers.SerializerMethodField()
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_image_variants(self, obj):
+        return variant_urls(obj.image, self.context.get('request'))
 
 
 class SellerShopSerializer(serializers.Serializer):
@@ -26,10 +33,22 @@ class SellerShopSerializer(serializers.Serializer):
     avatar = serializers.CharField(source="user.avatar")
 
 
-class ProductSerializer(serializers.Serializer):
+class ProductSerializer(SparseFieldsMixin, serializers.Serializer):
     """
     Сериализатор для получения товаров.
+    Поддерживает выбор полей через fields/exclude
     """
+    field_sources = {
+        'seller': (('seller', 'seller__business_name', 'seller__slug',
+                    'seller__user', 'seller__user__avatar'),
+                   ('seller', 'seller__user')),
+        'category': (('category', 'category__name', 'category__slug',
+                      'category__image'),
+                     ('category',)),
+        'image_variants': (('image1', 'image2', 'image3'), ()),
+        'rating': (('rating_avg', 'rating_count'), ()),
+    }
+
     seller = SellerShopSerializer()
     name = serializers.CharField()
     slug = serializers.SlugField()
@@ -40,13 +59,49 @@ class ProductSerializer(serializers.Serializer):
     image1 = serializers.ImageField()
     image2 = serializers.ImageField(required=False)
     image3 = serializers.ImageField(required=False)
+    image_variants = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_image_variants(self, obj):
+        """
+        Ссылки на уменьшенные WebP-варианты каждой картинки
+        """
+        request = self.context.get('request')
+        return {name: variant_urls(getattr(obj, name), request)
+                for name in ('image1', 'image2', 'image3')}
+
+    def get_rating(self, obj):
+        if obj.rating_count:
+            return round(obj.rating_avg, 1)
+        return None
+
+
+class ProductSummarySerializer(serializers.Serializer):
+    """
+    Сериализатор сводки товара: цена, рейтинг и гистограмма оценок
+    """
+    name = serializers.CharField()
+    slug = serializers.SlugField()
+    price_current = serializers.DecimalField(max_digits=10, decimal_places=2)
     rating = serializers.SerializerMethodField()
+    rating_count = serializers.IntegerField()
+    histogram = serializers.SerializerMethodField()
 
+    @extend_schema_field(OpenApiTypes.FLOAT)
     def get_rating(self, obj):
-        if obj.product_reviews.exists():
-            return round(avg_rating(obj.product_reviews.all()), 1)
+        if obj.rating_count:
+            return round(obj.rating_avg, 1)
         return None
 
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_histogram(self, obj):
+        """
+        Количество отзывов для каждой оценки от 1 до 5
+        """
+        return {str(value): getattr(obj, field)
+                for value, field in RATING_HISTOGRAM_FIELDS.items()}
+
 
 class CreateProductSerializer(serializers.Serializer):
     """
@@ -62,6 +117,34 @@ class CreateProductSerializer(serializers.Serializer):
     image3 = serializers.ImageField(required=False)
 
 
+class ImportProductSerializer(serializers.Serializer):
+    """
+    Сериализатор для валидации строки файла при массовом импорте товаров.
+    Картинки передаются путями к уже загруженным файлам
+    """
+    name = serializers.CharField(max_length=100)
+    desc = serializers.CharField()
+    price_current = serializers.DecimalField(max_digits=10, decimal_places=2)
+    price_old = serializers.DecimalField(max_digits=10,
+                                         decimal_places=2,
+                                         required=False,
+                                         allow_null=True)
+    category_slug = serializers.CharField()
+    in_stock = serializers.IntegerField(required=False, default=5)
+    image1 = serializers.CharField(max_length=100,
+                                   required=False,
+                                   allow_blank=True,
+                                   default='')
+    image2 = serializers.CharField(max_length=100,
+                                   required=False,
+                                   allow_blank=True,
+                                   default='')
+    image3 = serializers.CharField(max_length=100,
+                                   required=False,
+                                   allow_blank=True,
+                                   default='')
+
+
 class OrderItemProductSerializer(serializers.Serializer):
     """
     Сериализатор информации продукта, добавляемого в корзину
@@ -85,6 +168,43 @@ class OrderItemSerializer(serializers.Serializer):
     total = serializers.FloatField(source='get_total')
 
 
+class OrderedProductSerializer(OrderItemProductSerializer):
+    """
+    Сериализатор товара в оформленном заказе. Получает позицию заказа,
+    а цена берется из позиции - на момент оформления, как и сумма
+    """
+    seller = SellerSerializer(source='product.seller')
+    name = serializers.CharField(source='product.name')
+    slug = serializers.SlugField(source='product.slug')
+    price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        source='get_unit_price'
+    )
+
+
+class OrderedItemSerializer(OrderItemSerializer):
+    """
+    Сериализатор позиции оформленного заказа
+    """
+    product = OrderedProductSerializer(source='*')
+
+
+class CartSummarySerializer(serializers.Serializer):
+    """
+    Сериализатор сводки корзины: количество товаров и сумма
+    """
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartSerializer(CartSummarySerializer):
+    """
+    Сериализатор корзины: товары и сводка по ним
+    """
+    items = OrderItemSerializer(many=True)
+
+
 class ToggleCartItemSerializer(serializers.Serializer):
     """
     Сериализатор для валидации данных при добавлении, обновлении
@@ -94,6 +214,22 @@ class ToggleCartItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField()
 
 
+class CartItemOperationSerializer(ToggleCartItemSerializer):
+    """
+    Сериализатор одного изменения корзины в пакетном запросе
+    """
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """
+    Сериализатор для валидации пакета изменений корзины
+    """
+    items = CartItemOperationSerializer(many=True,
+                                        allow_empty=False,
+                                        max_length=100)
+
+
 class CheckoutSerializer(serializers.Serializer):
     """
     Сериализатор для валидации данных на этапе с этапа оформления
@@ -112,15 +248,23 @@ class OrderSerializer(serializers.Serializer):
     email = serializers.CharField(source='user.email')
     delivery_status = serializers.CharField()
     payment_status = serializers.CharField()
-    date_delivered = serializers.DateTimeField()
     shipping_details = serializers.SerializerMethodField()
     subtotal = serializers.DecimalField(
         max_digits=10, decimal_places=2, source='get_cart_subtotal'
     )
     total = serializers.DecimalField(
-        max_digits=10, decimal_places=2, source='get_cart_total'
+        max_digits=10, decimal_places=2, source='get_total'
     )
+    item_count = serializers.IntegerField(source='get_item_count')
 
     @extend_schema_field(ShippingAddressSerializer)
     def get_shipping_details(self, obj):
         return ShippingAddressSerializer(obj).data
+
+
+class OrderHistorySerializer(OrderSerializer):
+    """
+    Сериализатор заказа в истории заказов пользователя, с товарами
+    """
+    created_at = serializers.DateTimeField()
+    items = OrderedItemSerializer(many=True, source='orderitems')
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.images import process_new_images, remember_new_images
+from apps.sellers.models import Seller
+from apps.shop.facets import invalidate_facets
+from apps.shop.models import Category, Products, ProductSearchDocument
+from apps.shop.search import index_products, remove_documents
+
+
+@receiver(post_save, sender=Products)
+def index_product(sender, instance, **kwargs):
+    """
+    Обновление продукта в поисковом индексе после сохранения.
+    Мягко удаленный продукт из индекса убирается
+    """
+    index_products([instance.pk])
+
+
+@receiver(post_delete, sender=ProductSearchDocument)
+def remove_search_document(sender, instance, **kwargs):
+    """
+    Удаление строки индекса вместе с документом
+    (в том числе при удалении продукта из базы данных)
+    """
+    remove_documents([instance.pk])
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Seller)
+def check_name_changed(sender, instance, **kwargs):
+    """
+    Проверка, изменилось ли название категории или продавца.
+    Название хранится в индексе у каждого продукта
+    """
+    field = 'name' if sender is Category else 'business_name'
+    old_name = sender.objects.filter(pk=instance.pk).values_list(
+        field, flat=True
+    ).first()
+    instance._search_reindex = (old_name is not None
+                                and old_name != getattr(instance, field))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Seller)
+def reindex_related_products(sender, instance, **kwargs):
+    """
+    Переиндексация продуктов категории или продавца после
+    изменения названия
+    """
+    if getattr(instance, '_search_reindex', False):
+        index_products(instance.products.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Products)
+@receiver(post_delete, sender=Products)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Seller)
+def reset_facets(sender, **kwargs):
+    """
+    Сброс кеша фасетов при изменении товаров, категорий и продавцов
+    """
+    invalidate_facets()
+
+
+# Создание вариантов загруженных картинок
+pre_save.connect(remember_new_images, sender=Products)
+post_save.connect(process_new_images, sender=Products)
+pre_save.connect(remember_new_images, sender=Category)
+post_save.connect(process_new_images, sender=Category)
@@ -0,0 +1,282 @@
+import io
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.accounts.models import User
+from apps.profiles.models import Order, OrderItem, ShippingAddress
+from apps.sellers.models import Seller
+from apps.shop.fast_serializers import FastProductSerializer
+from apps.shop.importers import ProductImporter
+from apps.shop.management.commands.explain_product_queries import (
+    find_full_scans
+)
+from apps.shop.models import Category, Products
+from apps.shop.serializers import ProductSerializer
+
+
+def create_seller(email='seller@example.com'):
+    user = User.objects.create_user('Import', 'Seller', email, 'password',
+                                    account_type='SELLER')
+    return Seller.objects.create(
+        user=user, business_name='Import shop',
+        inn_identification_number='1', phone_number='1',
+        business_description='-', business_address='-', city='-',
+        postal_code='1', bank_name='-', bank_bic_number='1',
+        bank_account_number='1', bank_routing_number='1',
+        is_approved=True
+    )
+
+
+def create_product(seller, category, name, price, in_stock=5):
+    return Products.objects.create(
+        seller=seller, category=category, name=name, desc='-',
+        price_current=Decimal(price), in_stock=in_stock,
+        image1='products_image/x.jpg'
+    )
+
+
+class ProductImporterTests(TestCase):
+    def setUp(self):
+        self.seller = create_seller()
+        Category.objects.create(name='Phones',
+                                image='category_images/x.jpg')
+
+    def run_import(self, text):
+        stream = io.BytesIO(text.encode('utf-8'))
+        return ProductImporter(self.seller).run(stream, 'csv')
+
+    def test_blank_optional_cells_use_defaults(self):
+        result = self.run_import(
+            'name,desc,price_current,price_old,category_slug,in_stock\n'
+            'Phone,Good phone,10.00,,phones,\n'
+        )
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(result['created'], 1)
+        product = Products.objects.get(name='Phone')
+        self.assertEqual(product.in_stock, 5)
+        self.assertIsNone(product.price_old)
+        self.assertEqual(product.price_current, Decimal('10.00'))
+
+    def test_blank_required_cell_is_an_error(self):
+        result = self.run_import(
+            'name,desc,price_current,category_slug,in_stock\n'
+            'Phone,Good phone,,phones,3\n'
+        )
+        self.assertEqual(result['created'], 0)
+        self.assertIn('price_current', result['errors'][0]['errors'])
+
+
+class CartTestCase(TestCase):
+    """
+    Покупатель и два товара в наличии
+    """
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Phones',
+                                           image='category_images/x.jpg')
+        seller = create_seller()
+        self.phone = create_product(seller, category, 'Phone', '10.00')
+        self.case = create_product(seller, category, 'Case', '2.50')
+        self.buyer = User.objects.create_user('Buyer', 'User',
+                                              'buyer@example.com',
+                                              'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+
+class CartSummaryTests(CartTestCase):
+    def test_anonymous_request_is_rejected(self):
+        response = APIClient().get('/shop/cart/summary/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_summary_follows_cart_changes(self):
+        response = self.client.get('/shop/cart/summary/')
+        self.assertEqual(response.data, {'item_count': 0,
+                                         'subtotal': '0.00'})
+        self.client.post('/shop/cart/', {'slug': self.phone.slug,
+                                         'quantity': 2})
+        self.client.post('/shop/cart/', {'slug': self.case.slug,
+                                         'quantity': 1})
+        response = self.client.get('/shop/cart/summary/')
+        self.assertEqual(response.data, {'item_count': 3,
+                                         'subtotal': '22.50'})
+
+
+class CartBatchTests(CartTestCase):
+    def post_batch(self, items, client=None):
+        return (client or self.client).post('/shop/cart/batch/',
+                                            {'items': items},
+                                            format='json')
+
+    def test_anonymous_request_is_rejected(self):
+        response = self.post_batch([{'slug': self.phone.slug,
+                                     'quantity': 1}], client=APIClient())
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_adds_updates_and_removes_items(self):
+        self.post_batch([{'slug': self.phone.slug, 'quantity': 1},
+                         {'slug': self.case.slug, 'quantity': 4}])
+        response = self.post_batch([{'slug': self.phone.slug, 'quantity': 3},
+                                    {'slug': self.case.slug, 'quantity': 0}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['item_count'], 3)
+        self.assertEqual(response.data['subtotal'], '30.00')
+        summary = self.client.get('/shop/cart/summary/')
+        self.assertEqual(summary.data['item_count'], 3)
+
+    def test_unknown_slug_changes_nothing(self):
+        response = self.post_batch([{'slug': self.phone.slug, 'quantity': 1},
+                                    {'slug': 'missing', 'quantity': 1}])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['slugs'], ['missing'])
+        summary = self.client.get('/shop/cart/summary/')
+        self.assertEqual(summary.data['item_count'], 0)
+
+
+class CheckoutTests(CartTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shipping = ShippingAddress.objects.create(
+            user=self.buyer, full_name='Buyer User',
+            email='buyer@example.com', phone='1', address='-', city='-',
+            country='-', zipcode=1
+        )
+
+    def checkout(self, items):
+        self.client.post('/shop/cart/batch/', {'items': items},
+                         format='json')
+        return self.client.post('/shop/checkout/',
+                                {'shipping_id': self.shipping.id},
+                                format='json')
+
+    def test_checkout_decrements_stock(self):
+        response = self.checkout([{'slug': self.phone.slug, 'quantity': 5},
+                                  {'slug': self.case.slug, 'quantity': 1}])
+        self.assertEqual(response.status_code, 200)
+        self.phone.refresh_from_db()
+        self.case.refresh_from_db()
+        self.assertEqual((self.phone.in_stock, self.case.in_stock), (0, 4))
+
+    def test_checkout_resets_stock_facets(self):
+        url = '/shop/products/facets?in_stock=1'
+        self.assertEqual(self.client.get(url).data['categories'][0]['count'],
+                         2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.checkout([{'slug': self.phone.slug, 'quantity': 5}])
+        self.assertEqual(self.client.get(url).data['categories'][0]['count'],
+                         1)
+
+    def test_oversell_is_rejected_without_changes(self):
+        response = self.checkout([{'slug': self.phone.slug, 'quantity': 6},
+                                  {'slug': self.case.slug, 'quantity': 1}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['items'], [
+            {'slug': self.phone.slug, 'requested': 6, 'available': 5}
+        ])
+        self.phone.refresh_from_db()
+        self.case.refresh_from_db()
+        self.assertEqual((self.phone.in_stock, self.case.in_stock), (5, 5))
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(
+            OrderItem.objects.filter(user=self.buyer, order=None).count(), 2
+        )
+
+
+class ExplainProductQueriesTests(TestCase):
+    def test_full_scans_are_found(self):
+        plan = [
+            'SCAN U0',
+            'SCAN shop_products AS p LEFT-JOIN',
+            'SCAN sellers_seller',
+            'SCAN shop_products USING INDEX products_live_id_idx',
+            'SEARCH shop_products USING INDEX products_live_seller_idx '
+            '(seller_id=?)',
+            'SCAN shop_products_fts VIRTUAL TABLE INDEX 32:M4',
+            'SCAN CONSTANT ROW',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ]
+        self.assertEqual(find_full_scans('sqlite', plan), plan[:4])
+        self.assertEqual(
+            find_full_scans('sqlite', plan, allow_index_scan=True),
+            plan[:3]
+        )
+
+    def test_postgresql_index_scan_needs_condition(self):
+        plan = [
+            'Limit  (cost=0.14..8.16 rows=1 width=8)',
+            '  ->  Index Scan using products_live_id_idx on shop_products',
+            '        Filter: (in_stock >= 1)',
+            '  ->  Index Scan using products_live_seller_idx on '
+            'shop_products',
+            '        Index Cond: (seller_id = 1)',
+            '  ->  Seq Scan on sellers_seller  (cost=0.00..1.01 rows=1)',
+        ]
+        self.assertEqual(find_full_scans('postgresql', plan),
+                         [plan[1], plan[5]])
+
+    def test_catalog_queries_use_indexes(self):
+        call_command('explain_product_queries', stdout=io.StringIO())
+
+
+class FastProductSerializerTests(TestCase):
+    # Наборы полей (?fields=, ?exclude=), на которых сравниваются
+    # сериализаторы
+    FIELD_SETS = (
+        {},
+        {'fields': ['name', 'slug', 'price_current']},
+        {'exclude': ['desc', 'seller']},
+        {'fields': ['seller', 'category', 'rating']},
+    )
+
+    def setUp(self):
+        seller = create_seller()
+        category = Category.objects.create(name='Phones',
+                                           image='category_images/x.jpg')
+        for index in range(6):
+            product = create_product(
+                seller if index % 2 else None, category,
+                f'Phone {index}', f'{index}.99'
+            )
+            # Разные ветки представления: без старой цены, без второй
+            # картинки, без отзывов
+            Products.objects.filter(pk=product.pk).update(
+                price_old=Decimal(index * 2) if index % 3 else None,
+                image2='products_image/y.jpg' if index % 2 else '',
+                rating_sum=index * 4,
+                rating_count=index,
+                rating_avg=4.0 if index else None,
+            )
+
+    def render_drf(self, sparse_fields, request):
+        serializer = ProductSerializer(**sparse_fields)
+        queryset = serializer.optimize_queryset(
+            Products.objects.order_by('-created_at', '-id')
+        )
+        data = ProductSerializer(queryset, many=True,
+                                 context={'request': request},
+                                 **sparse_fields).data
+        return JSONRenderer().render(data)
+
+    def render_fast(self, sparse_fields, request):
+        serializer = FastProductSerializer(request=request, **sparse_fields)
+        rows = serializer.prepare_queryset(
+            Products.objects.order_by('-created_at', '-id')
+        )
+        return JSONRenderer().render(serializer.to_representation(rows))
+
+    def test_same_json_as_product_serializer(self):
+        request = APIRequestFactory().get('/shop/products/')
+        for sparse_fields in self.FIELD_SETS:
+            for current_request in (None, request):
+                with self.subTest(fields=sparse_fields,
+                                  request=current_request):
+                    self.assertEqual(
+                        self.render_fast(sparse_fields, current_request),
+                        self.render_drf(sparse_fields, current_request)
+                    )
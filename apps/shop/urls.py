@@ -3,17 +3,27 @@ from django.urls import path
 from apps.shop.views import (CategoriesView,
                              ProductsByCategoryView,
                              ProductsView,
+                             ProductFacetsView,
+                             ProductSearchView,
                              ProductsBySellerView,
                              ProductView,
+                             ProductSummaryView,
                              CartView,
+                             CartBatchView,
+                             CartSummaryView,
                              CheckoutView)
 
 urlpatterns = [
     path('categories/', CategoriesView.as_view()),
     path('categories/<slug:slug>/', ProductsByCategoryView.as_view()),
     path('products/', ProductsView.as_view()),
+    path('products/search', ProductSearchView.as_view()),
+    path('products/facets', ProductFacetsView.as_view()),
     path('sellers/<slug:slug>', ProductsBySellerView.as_view()),
     path('products/<slug:slug>', ProductView.as_view()),
+    path('products/<slug:slug>/summary', ProductSummaryView.as_view()),
     path('cart/', CartView.as_view()),
+    path('cart/batch/', CartBatchView.as_view()),
+    path('cart/summary/', CartSummaryView.as_view()),
     path('checkout/', CheckoutView.as_view())
 ]
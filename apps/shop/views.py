@@ -1,16 +1,33 @@
-from django.db.models import Prefetch
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.common.paginations import CustomPagination
-from apps.profiles.models import OrderItem, ShippingAddress, Order
+from apps.common.serializers import sparse_fields_from_request
+from apps.profiles.models import OrderItem, ShippingAddress
 from apps.sellers.models import Seller
+from apps.shop.cart import (EmptyCart, OutOfStock, get_cart_summary,
+                            invalidate_cart_summary, place_order,
+                            update_cart)
+from apps.shop.facets import get_product_facets
+from apps.shop.fast_serializers import FastProductSerializer
 from apps.shop.filters import ProductFilter
-from apps.shop.models import Category, Products
-from apps.shop.schema_examples import PRODUCT_PARAM_EXAMPLE
-from apps.shop.serializers import (CategorySerializer,
+from apps.shop.mixins import CartMixin, ProductListMixin
+from apps.shop.models import (RATING_HISTOGRAM_FIELDS, Category,
+                              Products)
+from apps.shop.schema_examples import (FACETS_PARAM_EXAMPLE,
+                                       PRODUCT_PARAM_EXAMPLE,
+                                       SEARCH_PARAM_EXAMPLE,
+                                       SPARSE_FIELDS_PARAM_EXAMPLE)
+from apps.shop.search import search_product_ids
+from apps.shop.serializers import (CartBatchSerializer,
+                                   CartSerializer,
+                                   CartSummarySerializer,
+                                   CategorySerializer,
                                    ProductSerializer,
+                                   ProductSummarySerializer,
                                    OrderItemSerializer,
                                    ToggleCartItemSerializer,
                                    CheckoutSerializer,
@@ -52,14 +69,15 @@ class CategoriesView(APIView):
         return Response(serializer.errors, status=400)
 
 
-class ProductsByCategoryView(APIView):
+class ProductsByCategoryView(ProductListMixin, APIView):
     serializer_class = ProductSerializer
 
     @extend_schema(
         operation_id="category_products",
         summary='Получение товаров по категории',
         description='Введите slug категории',
-        tags=tags
+        tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE
     )
     def get(self, request, *args, **kwargs):
         """
@@ -73,13 +91,11 @@ class ProductsByCategoryView(APIView):
             'seller',
             'seller__user'
         ).filter(category=category)
-        serializer = self.serializer_class(products, many=True)
-        return Response(serializer.data, status=200)
+        return self.get_paginated_products(request, products)
 
 
-class ProductsView(APIView):
+class ProductsView(ProductListMixin, APIView):
     serializer_class = ProductSerializer
-    pagination_class = CustomPagination
 
     @extend_schema(
         operation_id="all_products",
@@ -93,28 +109,80 @@ class ProductsView(APIView):
             'category',
             'seller',
             'seller__user',
-        ).prefetch_related(
-            Prefetch('product_reviews')
         ).all()
-        filterset = ProductFilter(request.GET, queryset=products)
-        if filterset.is_valid():
-            queryset = filterset.qs
-            paginator = self.pagination_class()
-            paginated_queryset = paginator.paginate_queryset(queryset,
-                                                             request)
-            serializer = self.serializer_class(paginated_queryset, many=True)
-            return paginator.get_paginated_response(serializer.data)
-        return Response(filterset.errors, status=400)
-
-
-class ProductsBySellerView(APIView):
+        return self.get_paginated_products(request, products)
+
+
+class ProductFacetsView(APIView):
+
+    @extend_schema(
+        operation_id='products_facets',
+        summary='Фасеты товаров',
+        description='Количество товаров по категориям, продавцам и '
+                    'ценовым диапазонам с учетом фильтров',
+        tags=tags,
+        parameters=FACETS_PARAM_EXAMPLE,
+        responses=OpenApiTypes.OBJECT
+    )
+    def get(self, request):
+        """
+        Получение фасетов для текущего набора фильтров
+        """
+        filterset = ProductFilter(request.GET,
+                                  queryset=Products.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        return Response(get_product_facets(filterset), status=200)
+
+
+class ProductSearchView(APIView):
+    serializer_class = ProductSerializer
+    pagination_class = CustomPagination
+
+    @extend_schema(
+        operation_id='search_products',
+        summary='Поиск товаров',
+        description='Поиск по названию, описанию, категории и продавцу. '
+                    'Товары отсортированы по релевантности',
+        tags=tags,
+        parameters=SEARCH_PARAM_EXAMPLE
+    )
+    def get(self, request):
+        """
+        Полнотекстовый поиск товаров по параметру q
+        """
+        query = request.query_params.get('q', '')
+        if not query.strip():
+            return Response({'message': 'Введите поисковый запрос'},
+                            status=400)
+
+        serializer = FastProductSerializer(
+            **sparse_fields_from_request(request)
+        )
+        paginator = self.pagination_class()
+        page_ids = paginator.paginate_queryset(search_product_ids(query),
+                                               request,
+                                               view=self)
+        rows = serializer.prepare_queryset(
+            Products.objects.filter(pk__in=page_ids),
+            extra_fields=('id',)
+        )
+        products = {row['id']: row for row in rows}
+        data = serializer.to_representation(
+            [products[pk] for pk in page_ids if pk in products]
+        )
+        return paginator.get_paginated_response(data)
+
+
+class ProductsBySellerView(ProductListMixin, APIView):
     serializer_class = ProductSerializer
 
     @extend_schema(
         operation_id='seller_products',
         summary='Получение товаров продавца',
         description='Введите slug продавца',
-        tags=tags
+        tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE
     )
     def get(self, request, *args, **kwargs):
         seller = Seller.objects.get_or_none(slug=kwargs.get('slug'))
@@ -124,51 +192,71 @@ class ProductsBySellerView(APIView):
             'category',
             'seller',
             'seller__user'
-        ).prefetch_related(
-            Prefetch('product_reviews')
         ).filter(seller=seller)
-        serializer = self.serializer_class(products, many=True)
-        return Response(serializer.data, status=200)
+        return self.get_paginated_products(request, products)
 
 
 class ProductView(APIView):
     serializer_class = ProductSerializer
 
-    def get_object(self, product_slug):
-        product = Products.objects.get_or_none(slug=product_slug)
+    def get_object(self, product_slug, queryset=None):
+        if queryset is None:
+            queryset = Products.objects.all()
+        product = queryset.get_or_none(slug=product_slug)
         return product
 
     @extend_schema(
         operation_id="product_detail",
         summary='Получение товара',
         description='Получение товара по полю slug',
+        tags=tags,
+        parameters=SPARSE_FIELDS_PARAM_EXAMPLE
+    )
+    def get(self, request, *args, **kwargs):
+        sparse_fields = sparse_fields_from_request(request)
+        queryset = self.serializer_class(
+            **sparse_fields
+        ).optimize_queryset(Products.objects.all())
+        product = self.get_object(kwargs.get('slug'), queryset)
+        if not product:
+            return Response({'message': 'Товар не найден'}, status=404)
+        serializer = self.serializer_class(product, **sparse_fields)
+        return Response(serializer.data, status=200)
+
+
+class ProductSummaryView(APIView):
+    serializer_class = ProductSummarySerializer
+
+    @extend_schema(
+        summary='Сводка товара',
+        description='Цена, рейтинг и количество отзывов с каждой оценкой '
+                    'от 1 до 5. Гистограмма хранится в товаре и '
+                    'обновляется при изменении отзывов',
         tags=tags
     )
     def get(self, request, *args, **kwargs):
-        product = self.get_object(kwargs.get('slug'))
+        product = Products.objects.only(
+            'name', 'slug', 'price_current', 'rating_avg', 'rating_count',
+            *RATING_HISTOGRAM_FIELDS.values()
+        ).get_or_none(slug=kwargs.get('slug'))
         if not product:
             return Response({'message': 'Товар не найден'}, status=404)
         serializer = self.serializer_class(product)
         return Response(serializer.data, status=200)
 
 
-class CartView(APIView):
+class CartView(CartMixin, APIView):
     serializer_class = OrderItemSerializer
 
     @extend_schema(
         summary='Получение продуктов в корзине',
-        description='Получение продуктов в корзине',
-        tags=tags
+        description='Получение продуктов в корзине с суммой каждой '
+                    'позиции, количеством товаров и суммой корзины',
+        tags=tags,
+        responses=CartSerializer
     )
     def get(self, request):
-        user = request.user
-        orderitem = OrderItem.objects.select_related(
-            'product',
-            'product__seller',
-            'product__seller__user'
-        ).filter(user=user, order=None)
-        serializer = self.serializer_class(orderitem, many=True)
-        return Response(serializer.data, status=200)
+        return self.get_cart_response(request.user)
 
     @extend_schema(
         summary='Изменение товара в корзине',
@@ -207,26 +295,75 @@ class CartView(APIView):
             orderitem.product = product
             serializer = self.serializer_class(orderitem)
             data = serializer.data
+        invalidate_cart_summary(user)
         return Response(data={'message': f'Товар {resp_message_substring}',
                               'item': data},
                         status=status)
 
 
+class CartBatchView(CartMixin, APIView):
+    serializer_class = CartBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary='Изменение нескольких товаров в корзине',
+        description='Добавить/удалить/изменить несколько товаров в '
+                    'корзине одним запросом. Количество 0 удаляет товар. '
+                    'Если товар указан несколько раз, применяется '
+                    'последнее значение. Возвращает корзину',
+        tags=tags,
+        responses=CartSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = {item['slug']: item['quantity']
+                      for item in serializer.validated_data['items']}
+
+        products = dict(Products.objects.filter(
+            slug__in=quantities
+        ).values_list('slug', 'id'))
+        missing = sorted(set(quantities) - set(products))
+        if missing:
+            return Response({'message': 'Товары не найдены',
+                             'slugs': missing},
+                            status=404)
+        update_cart(user, {products[slug]: quantity
+                           for slug, quantity in quantities.items()})
+        invalidate_cart_summary(user)
+        return self.get_cart_response(user)
+
+
+class CartSummaryView(APIView):
+    serializer_class = CartSummarySerializer
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary='Сводка корзины',
+        description='Количество товаров и сумма корзины. Значение '
+                    'кешируется и сбрасывается при изменении корзины',
+        tags=tags
+    )
+    def get(self, request):
+        summary = get_cart_summary(request.user)
+        serializer = self.serializer_class(summary)
+        return Response(serializer.data, status=200)
+
+
 class CheckoutView(APIView):
     serializer_class = CheckoutSerializer
 
     @extend_schema(
         summary='Проверка',
-        description='Создание заказа',
+        description='Создание заказа. Остатки товаров уменьшаются, цены '
+                    'фиксируются в заказе. Если какого-то товара не '
+                    'хватает, заказ не создается (409)',
         tags=tags,
         request=CheckoutSerializer
     )
     def post(self, request, *args, **kwargs):
         user = request.user
-        orderitems = OrderItem.objects.filter(user=user, order=None)
-        if not orderitems.exists():
-            return Response({'message': 'Корзина пуста'}, status=404)
-
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
@@ -253,9 +390,15 @@ class CheckoutView(APIView):
                 data[field] = value
             return data
 
-        order = Order.objects.create(user=user,
-                                     **append_shipping_details(shipping))
-        orderitems.update(order=order)
+        try:
+            order = place_order(user, **append_shipping_details(shipping))
+        except EmptyCart:
+            return Response({'message': 'Корзина пуста'}, status=404)
+        except OutOfStock as exc:
+            return Response({'message': 'Недостаточно товара на складе',
+                             'items': exc.items},
+                            status=409)
+        invalidate_cart_summary(user)
         serializer = OrderSerializer(order)
         return Response({'message': 'Успешная проверка',
                         'item': serializer.data},
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -94,6 +95,21 @@ DATABASES = {
     }
 }
 
+# Cache
+# Общий для всех процессов кеш в Redis (pip install redis), адрес
+# в переменной окружения REDIS_URL, например redis://127.0.0.1:6379/1.
+# Без него Django использует LocMemCache, свой у каждого процесса:
+# тогда пользователь в CachedJWTAuthentication не кешируется,
+# а остальные кеши живут недолго
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,10 +155,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Изменение основной модели пользователей на кастомную
 AUTH_USER_MODEL = 'accounts.User'
 
+# id новых записей (BaseModel) - упорядоченный по времени uuid7 вместо
+# uuid4. Уже созданные записи не меняются.
+# Миграции *_uuid7_primary_keys меняют только default поля id, но на
+# SQLite AlterField пересоздает каждую таблицу BaseModel (копия new__*,
+# INSERT ... SELECT, DROP, RENAME, индексы заново) - пользователи,
+# товары, заказы, отзывы. На большой базе их нужно применять в окно
+# обслуживания. На PostgreSQL они ничего не меняют в схеме
+UUID7_PRIMARY_KEYS = False
+
 # Настройка rest_framework
 REST_FRAMEWORK = {
+    # JWTAuthentication, который берет пользователя из кеша.
+    # Без общего кеша (REDIS_URL) пользователь берется из базы
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'apps.common.authentication.CachedJWTAuthentication'
+    ],
+    # JSON через orjson (pip install orjson). Без orjson классы работают
+    # как стандартные JSONRenderer и JSONParser
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.common.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -167,5 +205,10 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True, # После генерации нового refresh_token
                                       # старый отправляется в черный список
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7), # Время жизни access_token
-    'REFRESH_TOKEN_LIFETIME': timedelta(days=30) # Время жизни refresh_token
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=30), # Время жизни refresh_token
+    # Проверка черного списка через кеш при обновлении и проверке токенов
+    'TOKEN_REFRESH_SERIALIZER':
+        'apps.accounts.serializers.CachedTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER':
+        'apps.accounts.serializers.CachedTokenVerifySerializer',
 }